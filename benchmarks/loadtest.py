@@ -0,0 +1,303 @@
+# File: loadtest.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: End-to-end load test. Serves recorded (or generated) Baseball-Reference and
+# Baseball Savant pages from a local HTTP server with configurable latency and error rate,
+# drives the scrapers and PlayerLookup at a given concurrency and reports throughput,
+# latency percentiles, cache hit rates and peak memory.
+#
+# Usage: PYTHONPATH=. python benchmarks/loadtest.py [--pages DIR] [--requests 500] [--concurrency 50]
+#                                                  [--lookups 100] [--latency 0.2] [--error-rate 0.01]
+#
+# --pages is a directory laid out like the sites, e.g.
+#   DIR/www.baseball-reference.com/teams/LAD/2017.shtml
+#   DIR/www.baseball-reference.com/players/k/kershcl01.shtml
+#   DIR/baseballsavant.mlb.com/savant-player/jose-ramirez-608070
+#   DIR/register.zip                      (a Chadwick register archive, for PlayerLookup)
+# Without --pages a synthetic site is generated.
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import zipfile
+import numpy as np
+
+from pyball import cache, utils
+from pyball.baseball_reference_player import BaseballReferencePlayerStatsScraper
+from pyball.baseball_reference_team import BaseballReferenceTeamStatsScraper
+from pyball.playerid_lookup import PlayerLookup
+from pyball.savant import SavantScraper
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves files from the server's root directory after a random delay, failing a fraction of requests.
+    """
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(max(0.0, random.gauss(server.latency, server.jitter)))
+        if random.random() < server.error_rate:
+            self.send_error(503, "Injected failure")
+            return
+        path = os.path.normpath(os.path.join(server.root, self.path.split("?")[0].lstrip("/")))
+        if not path.startswith(server.root) or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip" if path.endswith(".zip") else "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSite(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, root: str, latency: float, jitter: float, error_rate: float):
+        super().__init__(("127.0.0.1", 0), MockSiteHandler)
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class CountingCache:
+    """
+    Wraps a cache backend and counts hits and misses per kind of entry.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def _kind(key: str) -> str:
+        if key.startswith("neg:"):
+            return "negative"
+        if key.startswith("table:"):
+            return "table"
+        if len(key) == 32:
+            return "page"
+        return "registry"
+
+    def _count(self, key, found):
+        counter = self.hits if found else self.misses
+        with self._lock:
+            counter[self._kind(key)] = counter.get(self._kind(key), 0) + 1
+
+    def get(self, key, default=None):
+        value = self._backend.get(key)
+        self._count(key, value is not None)
+        return default if value is None else value
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = self._backend.get_many(keys)
+        for key in keys:
+            self._count(key, key in found)
+        return found
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+def _table(table_id, columns, rows, totals=False):
+    header = "<tr>" + "".join(f"<th>{column}</th>" for column in columns) + "</tr>"
+    body = "".join(
+        "<tr>" + "".join(f"<td>{random.randint(0, 200)}</td>" for _ in columns) + "</tr>" for _ in range(rows)
+    )
+    if totals:
+        body += "<tr>" + "".join("<td>0</td>" for _ in columns) + "</tr>"
+    return f'<table id="{table_id}">{header}{body}</table>'
+
+
+def generate_site(root: str, teams: int = 30, players: int = 100):
+    """
+    Writes a synthetic site (team, player and Savant pages plus a register archive) under root.
+    """
+    filler = "<div>" + "<p>navigation, notes and ads</p>" * 2000 + "</div>"
+    columns = ["Name", "Age", "G", "PA", "AB", "R", "H", "2B", "3B", "HR", "RBI", "BB", "SO", "BA"]
+
+    for t in range(teams):
+        for year in ("2023", "2024"):
+            path = os.path.join(root, "www.baseball-reference.com", "teams", f"T{t:02d}", f"{year}.shtml")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"<html><body>{filler}{_table('team_batting', columns, 40, True)}"
+                        f"{_table('team_pitching', columns, 30, True)}</body></html>")
+
+    people = []
+    for p in range(players):
+        key = f"player{p:02d}"
+        path = os.path.join(root, "www.baseball-reference.com", "players", key[0], f"{key}.shtml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<html><body>{filler}{_table('batting_standard', columns, 15)}</body></html>")
+
+        mlbam = 600000 + p
+        server_vals = {
+            "playerId": mlbam,
+            "percentileRankings": [{"stat": stat, "percentile": random.randint(1, 100)}
+                                   for stat in ("xwoba", "xba", "k_percent", "bb_percent")],
+            "detailedPitches": [{"pitch_type": pitch, "release_speed": random.uniform(80, 100), "whiffs": random.randint(0, 90)}
+                                for pitch in ("FF", "SL", "CH", "CU")],
+        }
+        path = os.path.join(root, "baseballsavant.mlb.com", "savant-player", f"first-last{p}-{mlbam}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<html><head><script>var serverVals = {json.dumps(server_vals)};</script></head>"
+                    f"<body>{filler}</body></html>")
+        people.append(f"last{p},first{p},{mlbam},,{key},-1,2020,2024")
+
+    csv = "name_last,name_first,key_mlbam,key_retro,key_bbref,key_fangraphs,mlb_played_first,mlb_played_last\n"
+    with zipfile.ZipFile(os.path.join(root, "register.zip"), "w") as archive:
+        archive.writestr("register-master/data/people-0.csv", csv + "\n".join(people) + "\n")
+
+
+def build_workload(root: str, base_url: str):
+    """
+    Lists the scrape tasks for every recorded page, as (kind, url) pairs.
+    """
+    tasks = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            rel = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+            url = f"{base_url}/{rel}"
+            if rel.startswith("www.baseball-reference.com/teams/"):
+                tasks.append(("bbref_team", url))
+            elif rel.startswith("www.baseball-reference.com/players/"):
+                tasks.append(("bbref_player", url))
+            elif rel.startswith("baseballsavant.mlb.com/savant-player/"):
+                tasks.append(("savant", url))
+    return sorted(tasks)
+
+
+def run_task(task):
+    """
+    Runs one scrape or lookup and returns (kind, seconds, succeeded).
+    """
+    kind, target = task
+    start = time.perf_counter()
+    if kind == "bbref_team":
+        with BaseballReferenceTeamStatsScraper(target) as scraper:
+            ok = scraper.batting_stats() is not None and scraper.pitching_stats() is not None
+    elif kind == "bbref_player":
+        with BaseballReferencePlayerStatsScraper(target, tables=["batting"]) as scraper:
+            ok = scraper.batting_stats() is not None
+    elif kind == "savant":
+        with SavantScraper(target, tables=["percentile", "pitch_tracking"], render=False) as scraper:
+            ok = scraper.get_percentile_stats() is not None and scraper.get_pitch_tracking() is not None
+    else:
+        ok = len(PlayerLookup().search(target)) > 0
+    return kind, time.perf_counter() - start, ok
+
+
+def run(args):
+    with tempfile.TemporaryDirectory(prefix="pyball_loadtest_") as workdir:
+        root = args.pages
+        if root is None:
+            root = os.path.join(workdir, "site")
+            generate_site(root)
+
+        site = MockSite(root, args.latency, args.jitter, args.error_rate)
+        threading.Thread(target=site.serve_forever, daemon=True).start()
+
+        counting = CountingCache(cache.DiskCacheBackend(os.path.join(workdir, "cache")))
+        # Point pyball at the mock site and a throwaway cache, and put everything back afterwards
+        saved = (cache._backend, utils.USE_BROWSER, PlayerLookup.REGISTRY_URL)
+        cache.set_cache(counting)
+        utils.USE_BROWSER = False
+        PlayerLookup.REGISTRY_URL = f"{site.url}/register.zip"
+        try:
+            results, elapsed, tasks = run_workload(args, root, site.url)
+        finally:
+            site.shutdown()
+            site.server_close()
+            cache.set_cache(saved[0])
+            utils.USE_BROWSER = saved[1]
+            PlayerLookup.REGISTRY_URL = saved[2]
+
+    report(args, results, elapsed, tasks, counting)
+
+
+def run_workload(args, root: str, base_url: str):
+    """
+    Runs the scrapes and lookups and returns (results, elapsed seconds, tasks).
+    """
+    pages = build_workload(root, base_url)
+    tasks = [random.choice(pages) for _ in range(args.requests)]
+    if os.path.exists(os.path.join(root, "register.zip")):
+        tasks += [("lookup", f"last{random.randrange(100)}") for _ in range(args.lookups)]
+    random.shuffle(tasks)
+
+    start = time.perf_counter()
+    # The scrapers print and log every fetch, keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(run_task, tasks))
+    return results, time.perf_counter() - start, tasks
+
+
+def report(args, results, elapsed, tasks, counting):
+    """
+    Prints throughput, latency percentiles per kind of task and cache hit rates.
+    """
+    print(f"{len(tasks)} tasks, concurrency {args.concurrency}, latency {args.latency}s "
+          f"+/- {args.jitter}s, error rate {args.error_rate:.1%}")
+    print(f"elapsed {elapsed:.2f}s, throughput {len(tasks) / elapsed:.1f} tasks/s, "
+          f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    print(f"\n{'kind':<14}{'count':>7}{'failed':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for kind in sorted({result[0] for result in results}):
+        seconds = np.array([result[1] for result in results if result[0] == kind]) * 1000
+        failed = sum(not result[2] for result in results if result[0] == kind)
+        p50, p90, p99 = np.percentile(seconds, [50, 90, 99])
+        print(f"{kind:<14}{len(seconds):>7}{failed:>8}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}")
+    print(f"\n{'cache':<14}{'hits':>7}{'misses':>8}{'hit rate':>10}")
+    for kind in sorted(set(counting.hits) | set(counting.misses)):
+        hits, misses = counting.hits.get(kind, 0), counting.misses.get(kind, 0)
+        print(f"{kind:<14}{hits:>7}{misses:>8}{hits / (hits + misses):>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test pyball against a local mock site.")
+    parser.add_argument("--pages", help="Directory of recorded pages (default: generate a synthetic site)")
+    parser.add_argument("--requests", type=int, default=500, help="Number of page scrapes")
+    parser.add_argument("--lookups", type=int, default=100, help="Number of PlayerLookup searches")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    # Failures are counted in the report, keep per-request logging out of it
+    logging.disable(logging.ERROR)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
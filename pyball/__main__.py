@@ -0,0 +1,5 @@
+import sys
+
+from pyball.cli import main
+
+sys.exit(main())
@@ -0,0 +1,212 @@
+# File: baseball_reference_gamelog.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing functions to obtain player and team game logs from Baseball-Reference
+
+from typing import Iterable, Optional, Tuple
+import logging
+import re
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from pyball.scraper import TableScraper
+from pyball.utils import is_bbref_player_url, is_bbref_team_url, record_negative
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BaseballReferenceGameLogScraper(TableScraper):
+    """
+    A class for scraping single-season game logs from Baseball-Reference.
+
+    Works with both player game log pages (make_bbref_player_gamelog_url) and
+    team game log pages (create_bbref_team_gamelog_url).
+
+    Attributes:
+    -----------
+    url : str
+        The URL of the Baseball-Reference game log page.
+
+    Methods:
+    --------
+    batting_gamelog(self) -> Optional[pd.DataFrame]:
+        Retrieves the batting game log, one row per game.
+
+    pitching_gamelog(self) -> Optional[pd.DataFrame]:
+        Retrieves the pitching game log, one row per game.
+
+    close(self) -> None:
+        Releases the parsed page. Tables already extracted stay available.
+
+    table_delta(self, table, consumer) -> Optional[pd.DataFrame]:
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+    commit_delta(self, table, consumer) -> None:
+        Marks the current version of a table as loaded by the consumer.
+    """
+
+    TABLE_IDS = {
+        'batting': 'batting_gamelogs',
+        'pitching': 'pitching_gamelogs'
+    }
+    # Team game log pages prefix the table ids
+    TEAM_TABLE_PREFIX = 'team_'
+
+    __slots__ = ()
+
+    def __init__(self, url: str, tables: Optional[Iterable[str]] = None):
+        """
+        Initializes a new instance of the BaseballReferenceGameLogScraper class.
+
+        Parameters:
+        -----------
+        url : str
+            The URL of the Baseball-Reference player or team game log page.
+        tables : Iterable[str], optional
+            Keys of TABLE_IDS the caller needs. When given, the browser only waits
+            for these tables to load. Defaults to waiting on the whole page.
+
+        Raises:
+        -------
+        ValueError:
+            If the provided URL is invalid.
+        """
+        if not (is_bbref_player_url(url) or is_bbref_team_url(url)):
+            raise ValueError(f"Invalid game log URL: {url}")
+        super().__init__(url, tables)
+
+    def _html_id(self, table: str) -> str:
+        """
+        Returns the HTML id of the table on this page (team pages prefix it with 'team_').
+        """
+        if is_bbref_team_url(self.url):
+            return self.TEAM_TABLE_PREFIX + self.TABLE_IDS[table]
+        return self.TABLE_IDS[table]
+
+    def _parse_table(self, table: BeautifulSoup):
+        rows = []
+        for row in table.find_all('tr'):
+            classes = row.get('class', [])
+            # Skip hidden rows and the header rows repeated every few games (but keep the real header)
+            if 'hidden' in classes or ('thead' in classes and rows):
+                continue
+            if row.find_parent('tfoot') is not None:
+                continue
+            cells = row.find_all(['th', 'td'])
+            rows.append([cell.text.strip() for cell in cells])
+
+        return rows
+
+    def _table_to_frame(self, table_id: str, table: BeautifulSoup) -> Optional[pd.DataFrame]:
+        """
+        Parses the HTML game log table and returns it as a pandas DataFrame.
+
+        Parameters:
+        -----------
+        table_id : str
+            The ID of the table to parse.
+        table : BeautifulSoup
+            The table element.
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]:
+            The parsed table as a pandas DataFrame, or None if it has no games.
+        """
+        rows = self._parse_table(table)
+        if len(rows) < 2:
+            logger.warning("No games found in %s game log for URL: %s", table_id, self.url)
+            record_negative(self.url, "no games", self._html_id(table_id))
+            return None
+        return pd.DataFrame(rows[1:], columns=rows[0]).dropna(how="all")
+
+    def batting_gamelog(self) -> Optional[pd.DataFrame]:
+        """
+        Retrieves the batting game log, one row per game.
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]:
+            The batting game log as a pandas DataFrame, or None if not available.
+        """
+        return self._get_dataframe('batting')
+
+    def pitching_gamelog(self) -> Optional[pd.DataFrame]:
+        """
+        Retrieves the pitching game log, one row per game.
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]:
+            The pitching game log as a pandas DataFrame, or None if not available.
+        """
+        return self._get_dataframe('pitching')
+
+
+DOUBLEHEADER_PATTERN = re.compile(r"\((\d)\)")
+
+
+def game_keys(gamelog: pd.DataFrame, year) -> pd.DataFrame:
+    """
+    Returns the date and doubleheader game number of every game in a game log.
+
+    Handles both "2024-04-01" and "Apr 1" / "Jul 4 (2)" style dates.
+
+    Parameters:
+    -----------
+    gamelog : pd.DataFrame
+        A game log with a 'Date' column.
+    year : str or int
+        The season of the game log, for dates without a year.
+
+    Returns:
+    --------
+    pd.DataFrame
+        'date' (NaT for rows that are not games) and 'game' (0, or 1/2 for doubleheaders), aligned with gamelog.
+    """
+    text = gamelog['Date'].astype(str).str.replace('\xa0', ' ')
+    game = text.str.extract(DOUBLEHEADER_PATTERN, expand=False).fillna(0).astype(int)
+    text = text.str.replace(DOUBLEHEADER_PATTERN, '', regex=True).str.strip()
+    date = pd.to_datetime(text, format='%Y-%m-%d', errors='coerce')
+    short = pd.to_datetime(text + f" {year}", format='%b %d %Y', errors='coerce')
+    return pd.DataFrame({'date': date.fillna(short), 'game': game}, index=gamelog.index)
+
+
+def games_after(gamelog: pd.DataFrame, year, last_game: Optional[Tuple[str, int]]) -> pd.DataFrame:
+    """
+    Returns the games of a game log played after the given game.
+
+    Parameters:
+    -----------
+    gamelog : pd.DataFrame
+        A game log with a 'Date' column.
+    year : str or int
+        The season of the game log.
+    last_game : Tuple[str, int], optional
+        ISO date and doubleheader game number of the last game already ingested, or None.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The rows for games after last_game (every game if last_game is None).
+    """
+    keys = game_keys(gamelog, year)
+    played = keys['date'].notna()
+    if last_game is None:
+        return gamelog[played]
+    last_date, last_number = pd.Timestamp(last_game[0]), last_game[1]
+    newer = (keys['date'] > last_date) | ((keys['date'] == last_date) & (keys['game'] > last_number))
+    return gamelog[played & newer]
+
+
+def latest_game(gamelog: pd.DataFrame, year) -> Optional[Tuple[str, int]]:
+    """
+    Returns the ISO date and doubleheader game number of the last game in a game log, or None if it has no games.
+    """
+    keys = game_keys(gamelog, year).dropna(subset=['date'])
+    if keys.empty:
+        return None
+    latest = keys.sort_values(['date', 'game']).iloc[-1]
+    return latest['date'].strftime('%Y-%m-%d'), int(latest['game'])
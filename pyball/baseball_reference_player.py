@@ -4,18 +4,19 @@
 #
 # Description: File containing functions to obtain player stats from Baseball-Reference
 
-from typing import Optional
+from typing import Iterable, Optional
 import logging
 import pandas as pd
 from bs4 import BeautifulSoup
 
-from pyball.utils import read_url, is_bbref_player_url
+from pyball.scraper import TableScraper
+from pyball.utils import is_bbref_player_url, record_negative
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class BaseballReferencePlayerStatsScraper:
+class BaseballReferencePlayerStatsScraper(TableScraper):
     """
     A class for scraping player statistics from Baseball-Reference.
 
@@ -34,6 +35,15 @@ class BaseballReferencePlayerStatsScraper:
 
     pitching_stats(self) -> Optional[pd.DataFrame]:
         Retrieves the pitching statistics for the player.
+
+    close(self) -> None:
+        Releases the parsed page. Tables already extracted stay available.
+
+    table_delta(self, table, consumer) -> Optional[pd.DataFrame]:
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+    commit_delta(self, table, consumer) -> None:
+        Marks the current version of a table as loaded by the consumer.
     """
 
     TABLE_IDS = {
@@ -41,7 +51,9 @@ class BaseballReferencePlayerStatsScraper:
         'pitching': 'pitching_standard'
     }
 
-    def __init__(self, url: str):
+    __slots__ = ()
+
+    def __init__(self, url: str, tables: Optional[Iterable[str]] = None):
         """
         Initializes a new instance of the BaseballReferencePlayerStatsScraper class.
 
@@ -49,6 +61,9 @@ class BaseballReferencePlayerStatsScraper:
         -----------
         url : str
             The URL of the Baseball-Reference profile page for the player.
+        tables : Iterable[str], optional
+            Keys of TABLE_IDS the caller needs. When given, the browser only waits
+            for these tables to load. Defaults to waiting on the whole page.
 
         Raises:
         -------
@@ -57,40 +72,7 @@ class BaseballReferencePlayerStatsScraper:
         """
         if not is_bbref_player_url(url):
             raise ValueError(f"Invalid player URL: {url}")
-        self.url = url
-        self.soup = self._get_soup()
-        if self.soup is None:
-            logger.warning("Failed to retrieve content from URL: %s", self.url)
-
-    def _get_soup(self) -> Optional[BeautifulSoup]:
-        """
-        Retrieves the BeautifulSoup object for the player's profile page.
-
-        Returns:
-        --------
-        Optional[BeautifulSoup]:
-            The BeautifulSoup object representing the player's profile page, or None if retrieval failed.
-        """
-        soup = read_url(self.url)
-        if soup is None:
-            logger.warning("Failed to retrieve content from URL: %s", self.url)
-        return soup
-
-    def _find_table(self, table_id: str) -> Optional[BeautifulSoup]:
-        """
-        Finds the HTML table element with the specified ID.
-
-        Parameters:
-        -----------
-        table_id : str
-            The ID of the table to find.
-
-        Returns:
-        --------
-        Optional[BeautifulSoup]:
-            The BeautifulSoup object representing the found table, or None if not found.
-        """
-        return self.soup.find("table", id=self.TABLE_IDS[table_id])
+        super().__init__(url, tables)
 
     def _parse_table(self, table: BeautifulSoup):
         rows = []
@@ -103,7 +85,7 @@ class BaseballReferencePlayerStatsScraper:
 
         return rows
 
-    def _get_dataframe(self, table_id: str) -> Optional[pd.DataFrame]:
+    def _table_to_frame(self, table_id: str, table: BeautifulSoup) -> Optional[pd.DataFrame]:
         """
         Parses the HTML table and returns it as a pandas DataFrame.
 
@@ -111,29 +93,22 @@ class BaseballReferencePlayerStatsScraper:
         -----------
         table_id : str
             The ID of the table to parse.
+        table : BeautifulSoup
+            The table element.
 
         Returns:
         --------
         Optional[pd.DataFrame]:
-            The parsed table as a pandas DataFrame, or None if parsing failed.
+            The parsed table as a pandas DataFrame, or None if it has no visible rows.
         """
-        table = self._find_table(table_id)
-        if table is None:
-            logger.warning("%s stats table not found for URL: %s", table_id.capitalize(), self.url)
+        rows = self._parse_table(table)
+        if not rows:
+            logger.warning("No visible rows found in %s stats table (not an MLB player?)", table_id)
+            record_negative(self.url, "no visible rows", self.TABLE_IDS[table_id])
             return None
 
-        try:
-            rows = self._parse_table(table)
-            if not rows:
-                logger.warning("No visible rows found in %s stats table (not an MLB player?)", table_id)
-                return None
-
-            # Create DataFrame directly from the parsed rows
-            df = pd.DataFrame(rows[1:], columns=rows[0])
-            return df.dropna(how="all")
-        except Exception as e:
-            logger.error("Error parsing %s stats table: %s", table_id, str(e))
-            return None
+        # Create DataFrame directly from the parsed rows
+        return pd.DataFrame(rows[1:], columns=rows[0]).dropna(how="all")
 
     def batting_stats(self) -> Optional[pd.DataFrame]:
         """
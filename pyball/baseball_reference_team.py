@@ -4,18 +4,19 @@
 #
 # Description: File containing functions to obtain team stats from Baseball-Reference
 
-from typing import Optional
+from typing import Iterable, Optional
 import logging
 import pandas as pd
 from bs4 import BeautifulSoup
 
-from pyball.utils import read_url, is_bbref_team_url
+from pyball.scraper import TableScraper
+from pyball.utils import is_bbref_team_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class BaseballReferenceTeamStatsScraper:
+class BaseballReferenceTeamStatsScraper(TableScraper):
     """
     A class for scraping team statistics from Baseball-Reference.
 
@@ -34,6 +35,15 @@ class BaseballReferenceTeamStatsScraper:
 
     pitching_stats(self) -> Optional[pd.DataFrame]
         Returns the pitching stats for the team as a pandas DataFrame.
+
+    close(self)
+        Releases the parsed page. Tables already extracted stay available.
+
+    table_delta(self, table, consumer)
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+    commit_delta(self, table, consumer)
+        Marks the current version of a table as loaded by the consumer.
     """
 
     TABLE_IDS = {
@@ -41,7 +51,9 @@ class BaseballReferenceTeamStatsScraper:
         'pitching': 'team_pitching'
     }
 
-    def __init__(self, url: str):
+    __slots__ = ()
+
+    def __init__(self, url: str, tables: Optional[Iterable[str]] = None):
         """
         Initializes a BaseballReferenceTeamStatsScraper instance.
 
@@ -49,6 +61,9 @@ class BaseballReferenceTeamStatsScraper:
         -----------
         url : str
             The URL of the Baseball-Reference page for the team.
+        tables : Iterable[str], optional
+            Keys of TABLE_IDS the caller needs. When given, the browser only waits
+            for these tables to load. Defaults to waiting on the whole page.
 
         Raises:
         -------
@@ -57,44 +72,9 @@ class BaseballReferenceTeamStatsScraper:
         """
         if not is_bbref_team_url(url):
             raise ValueError(f"Invalid team URL: {url}")
-        self.url = url
-        self.soup = self._get_soup()
-        if self.soup is None:
-            logger.warning("Failed to retrieve content from URL: %s", self.url)
-
-    def _get_soup(self) -> Optional[BeautifulSoup]:
-        """
-        Retrieves the BeautifulSoup object for the team's Baseball-Reference page.
-
-        Returns:
-        --------
-        Optional[BeautifulSoup]
-            The BeautifulSoup object representing the HTML content of the page,
-            or None if the content retrieval fails.
-        """
-        soup = read_url(self.url)
-        if soup is None:
-            logger.warning("Failed to retrieve content from URL: %s", self.url)
-        return soup
-
-    def _find_table(self, table_id: str) -> Optional[BeautifulSoup]:
-        """
-        Finds the HTML table element with the specified ID in the team's page.
-
-        Parameters:
-        -----------
-        table_id : str
-            The ID of the table to find.
-
-        Returns:
-        --------
-        Optional[BeautifulSoup]
-            The BeautifulSoup object representing the found table element,
-            or None if the table is not found.
-        """
-        return self.soup.find("table", id=self.TABLE_IDS[table_id])
+        super().__init__(url, tables)
 
-    def _get_dataframe(self, table_id: str) -> Optional[pd.DataFrame]:
+    def _table_to_frame(self, table_id: str, table: BeautifulSoup) -> Optional[pd.DataFrame]:
         """
         Parses the HTML table with the specified ID and returns it as a pandas DataFrame.
 
@@ -102,28 +82,17 @@ class BaseballReferenceTeamStatsScraper:
         -----------
         table_id : str
             The ID of the table to parse.
+        table : BeautifulSoup
+            The table element.
 
         Returns:
         --------
         Optional[pd.DataFrame]
-            The parsed table as a pandas DataFrame,
-            or None if the table is not found or an error occurs during parsing.
+            The parsed table as a pandas DataFrame, without the team totals row.
         """
-        table = self._find_table(table_id)
-        if table is None:
-            logger.warning("%s stats table not found for URL: %s", table_id.capitalize(), self.url)
-            return None
-
-        try:
-            df = pd.read_html(str(table))[0]
-            df = df.iloc[:-1]
-            return df.dropna(how="all")
-        except ValueError as e:
-            logger.error("Error parsing %s stats table (no tables found): %s", table_id, str(e))
-            return None
-        except Exception as e:
-            logger.error("Error parsing %s stats table: %s", table_id, str(e))
-            return None
+        df = pd.read_html(str(table))[0]
+        df = df.iloc[:-1]
+        return df.dropna(how="all")
 
     def batting_stats(self) -> Optional[pd.DataFrame]:
         """
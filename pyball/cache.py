@@ -0,0 +1,217 @@
+# File: cache.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing the cache backends used for fetched pages, parsed tables
+# and the player registry.
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Protocol
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import zlib
+import diskcache
+import requests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = './.pyball_cache'
+CACHE_URL_ENV = 'PYBALL_CACHE_URL'
+CACHE_SECRET_ENV = 'PYBALL_CACHE_SECRET'
+
+
+class CacheBackend(Protocol):
+    """
+    The interface every cache backend implements. Keys are strings, values are any picklable object.
+    """
+
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> bool:
+        ...
+
+    def delete(self, key: str) -> bool:
+        ...
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        ...
+
+    def set_many(self, items: Dict[str, Any], expire: Optional[float] = None) -> bool:
+        ...
+
+    def iterkeys(self, prefix: str = '') -> Iterator[str]:
+        ...
+
+
+class DiskCacheBackend:
+    """
+    A cache backend storing entries in a local diskcache directory (one per machine).
+
+    Attributes:
+    -----------
+    path : str
+        The directory of the diskcache.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._cache = diskcache.Cache(path)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._cache.get(key, default)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> bool:
+        return self._cache.set(key, value, expire=expire)
+
+    def delete(self, key: str) -> bool:
+        return self._cache.delete(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = self._cache.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], expire: Optional[float] = None) -> bool:
+        with self._cache.transact():
+            for key, value in items.items():
+                self._cache.set(key, value, expire=expire)
+        return True
+
+    def iterkeys(self, prefix: str = '') -> Iterator[str]:
+        return (key for key in self._cache.iterkeys() if isinstance(key, str) and key.startswith(prefix))
+
+
+class RemoteCacheBackend:
+    """
+    A cache backend talking to a shared pyball cache server (see pyball.cache_server), so a page
+    fetched by one node is a cache hit for every other node.
+
+    Values are pickled and zlib-compressed on the client; the server only stores opaque bytes.
+    Every value is signed with an HMAC of a secret shared by the nodes (and bound to its key),
+    and values whose signature does not check out are treated as misses without being unpickled,
+    so whoever can reach the server cannot make the nodes run code.
+    If the server cannot be reached, reads are treated as misses and writes are dropped.
+
+    Attributes:
+    -----------
+    url : str
+        Base URL of the cache server, e.g. "http://cache-host:8765".
+    timeout : float
+        Seconds to wait for the server on each request.
+    compression_level : int
+        zlib compression level used for values.
+    """
+
+    SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+    def __init__(self, url: str, secret: Optional[str] = None, timeout: float = 10, compression_level: int = 6):
+        """
+        Initializes a RemoteCacheBackend instance.
+
+        Parameters:
+        -----------
+        url : str
+            Base URL of the cache server.
+        secret : str, optional
+            Secret shared by every node, used to sign values. Defaults to the PYBALL_CACHE_SECRET
+            environment variable.
+
+        Raises:
+        -------
+        ValueError:
+            If no secret is given or set in the environment.
+        """
+        secret = secret if secret is not None else os.environ.get(CACHE_SECRET_ENV)
+        if not secret:
+            raise ValueError(f"A shared secret is required for the remote cache, set {CACHE_SECRET_ENV}")
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.compression_level = compression_level
+        self._secret = secret.encode()
+        self._session = requests.Session()
+
+    def _signature(self, key: str, data: bytes) -> bytes:
+        return hmac.new(self._secret, key.encode() + b'\0' + data, hashlib.sha256).digest()
+
+    def _encode(self, key: str, value: Any) -> str:
+        compressed = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+        return base64.b64encode(self._signature(key, compressed) + compressed).decode('ascii')
+
+    def _decode(self, key: str, data: str) -> Any:
+        """
+        Returns the value of an entry, or None if its signature is wrong (it is never unpickled then).
+        """
+        raw = base64.b64decode(data)
+        signature, compressed = raw[:self.SIGNATURE_SIZE], raw[self.SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, self._signature(key, compressed)):
+            logger.warning("Ignoring cache entry %s with an invalid signature", key)
+            return None
+        return pickle.loads(zlib.decompress(compressed))
+
+    def _post(self, endpoint: str, payload: dict) -> Optional[dict]:
+        try:
+            response = self._session.post(f"{self.url}/{endpoint}", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Cache server request to %s failed: %s", endpoint, str(e))
+            return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> bool:
+        return self.set_many({key: value}, expire=expire)
+
+    def delete(self, key: str) -> bool:
+        result = self._post('delete', {'keys': [key]})
+        return bool(result and result['deleted'])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        result = self._post('get_many', {'keys': list(keys)})
+        if result is None:
+            return {}
+        values = {key: self._decode(key, data) for key, data in result['values'].items()}
+        return {key: value for key, value in values.items() if value is not None}
+
+    def set_many(self, items: Dict[str, Any], expire: Optional[float] = None) -> bool:
+        payload = {'items': {key: self._encode(key, value) for key, value in items.items()}, 'expire': expire}
+        return self._post('set_many', payload) is not None
+
+    def iterkeys(self, prefix: str = '') -> Iterator[str]:
+        # Filtered on the server, so listing one kind of entry does not download the whole keyspace
+        result = self._post('keys', {'prefix': prefix})
+        return iter(result['keys'] if result else [])
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_cache() -> CacheBackend:
+    """
+    Returns the cache backend in use, creating the default one on first use.
+
+    The default is a RemoteCacheBackend if the PYBALL_CACHE_URL environment variable is set
+    (signing with PYBALL_CACHE_SECRET), otherwise a DiskCacheBackend in ./.pyball_cache.
+    """
+    global _backend
+    if _backend is None:
+        url = os.environ.get(CACHE_URL_ENV)
+        _backend = RemoteCacheBackend(url) if url else DiskCacheBackend()
+    return _backend
+
+
+def set_cache(backend: CacheBackend) -> None:
+    """
+    Sets the cache backend used for fetched pages, parsed tables and the player registry.
+    """
+    global _backend
+    _backend = backend
@@ -0,0 +1,116 @@
+# File: cache_server.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: A small HTTP cache server shared by every pyball node (see RemoteCacheBackend).
+#
+# Usage: python -m pyball.cache_server [--host 0.0.0.0] [--port 8765] [--path ./.pyball_cache_server]
+#
+# Values are stored as the opaque (signed, compressed, encoded) strings the clients send and are
+# never unpickled by the server. Clients only unpickle values signed with their shared secret
+# (PYBALL_CACHE_SECRET), but the server has no authentication of its own: anyone who can reach it
+# can read or delete entries, so keep it off public networks.
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import diskcache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the JSON endpoints of the cache server: get_many, set_many, delete and keys.
+    """
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        store = self.server.store
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            endpoint = self.path.strip("/")
+            if endpoint == "get_many":
+                values = {}
+                for key in request["keys"]:
+                    value = store.get(key)
+                    if value is not None:
+                        values[key] = value
+                self._reply(200, {"values": values})
+            elif endpoint == "set_many":
+                expire = request.get("expire") or self.server.default_ttl
+                with store.transact():
+                    for key, value in request["items"].items():
+                        store.set(key, value, expire=expire)
+                self._reply(200, {"stored": len(request["items"])})
+            elif endpoint == "delete":
+                deleted = sum(bool(store.delete(key)) for key in request["keys"])
+                self._reply(200, {"deleted": deleted})
+            elif endpoint == "keys":
+                prefix = request.get("prefix") or ""
+                self._reply(200, {"keys": [key for key in store.iterkeys() if key.startswith(prefix)]})
+            else:
+                self._reply(404, {"error": f"Unknown endpoint: {self.path}"})
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class CacheServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server storing cache entries in a diskcache directory.
+
+    Attributes:
+    -----------
+    store : diskcache.Cache
+        Where the entries are kept.
+    default_ttl : float or None
+        Expiry (in seconds) for entries stored without one. None keeps them until deleted.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 path: str = "./.pyball_cache_server", default_ttl=None):
+        super().__init__((host, port), CacheRequestHandler)
+        self.store = diskcache.Cache(path)
+        self.default_ttl = default_ttl
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a shared pyball cache server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="./.pyball_cache_server", help="Directory to store entries in")
+    parser.add_argument("--ttl", type=float, default=None, help="Default expiry in seconds")
+    args = parser.parse_args()
+
+    server = CacheServer(args.host, args.port, args.path, args.ttl)
+    logger.info("Serving pyball cache on %s", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
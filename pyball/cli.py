@@ -0,0 +1,368 @@
+# File: cli.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing the `pyball` command line interface.
+#
+# Usage: pyball export --teams LAD,NYY --years 2000-2024 --format parquet --output export/
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+import argparse
+import csv
+import logging
+import os
+import sys
+import pandas as pd
+
+from pyball.utils import create_bbref_team_url, make_bbref_player_url
+from pyball.baseball_reference_team import BaseballReferenceTeamStatsScraper
+from pyball.baseball_reference_player import BaseballReferencePlayerStatsScraper
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROGRESS_FILE = '.pyball_export_progress'
+
+
+def _parse_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def _parse_years(value: Optional[str]) -> List[str]:
+    """
+    Parses a comma separated list of years and ranges, e.g. "2000-2003,2010".
+    """
+    years = []
+    for item in _parse_list(value):
+        if '-' in item:
+            start, end = item.split('-', 1)
+            years.extend(str(year) for year in range(int(start), int(end) + 1))
+        else:
+            years.append(str(int(item)))
+    return years
+
+
+class CsvTableWriter:
+    """
+    Appends DataFrames to a CSV file, writing the header once and keeping the first frame's columns.
+    """
+
+    # Pages written between two commit() calls
+    PAGES_PER_COMMIT = 1
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.columns = None
+        if not append and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Resuming, keep appending under the existing header
+            with open(path, newline='', encoding='utf-8') as f:
+                self.columns = next(csv.reader(f))
+
+    def write(self, df: pd.DataFrame):
+        header = self.columns is None
+        if header:
+            self.columns = [str(column) for column in df.columns]
+        df = df.set_axis([str(column) for column in df.columns], axis=1).reindex(columns=self.columns)
+        df.to_csv(self.path, mode='a', header=header, index=False)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonLinesTableWriter:
+    """
+    Appends DataFrames to a newline-delimited JSON file, one record per line.
+    """
+
+    PAGES_PER_COMMIT = 1
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        if not append and os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        df = df.set_axis([str(column) for column in df.columns], axis=1)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(df.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ParquetTableWriter:
+    """
+    Streams DataFrames into Parquet part files one row group at a time (requires pyarrow).
+
+    Parquet files cannot be appended to and are unreadable until their footer is written, so rows
+    go to a temporary file that commit() finalizes as the next part file. Temporary files left by an
+    interrupted run are discarded; their pages were never marked done and are exported again.
+    Columns are stored as strings so tables from different seasons share one schema.
+    """
+
+    PAGES_PER_COMMIT = 50
+
+    def __init__(self, path: str, append: bool = True):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise SystemExit("Parquet output requires pyarrow: pip install pyarrow") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._base, self._ext = os.path.splitext(path)
+        self._part = 0
+        while os.path.exists(self._part_path(self._part)):
+            if not append:
+                os.remove(self._part_path(self._part))
+            self._part += 1
+        if not append:
+            self._part = 0
+        if os.path.exists(self._part_path(self._part) + '.tmp'):
+            os.remove(self._part_path(self._part) + '.tmp')
+        self.columns = None
+        self._writer = None
+
+    def _part_path(self, part: int) -> str:
+        return f"{self._base}.part-{part}{self._ext}"
+
+    def write(self, df: pd.DataFrame):
+        df = df.set_axis([str(column) for column in df.columns], axis=1)
+        if self.columns is None:
+            self.columns = list(df.columns)
+        df = df.reindex(columns=self.columns).astype('string')
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._part_path(self._part) + '.tmp', table.schema)
+        self._writer.write_table(table)
+
+    def commit(self):
+        """
+        Writes the footer of the current part file and moves it into place.
+        """
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        os.replace(self._part_path(self._part) + '.tmp', self._part_path(self._part))
+        self._part += 1
+
+    def close(self):
+        self.commit()
+
+
+WRITERS = {
+    'csv': (CsvTableWriter, '.csv'),
+    'jsonl': (JsonLinesTableWriter, '.jsonl'),
+    'parquet': (ParquetTableWriter, '.parquet'),
+}
+
+SCRAPERS = {
+    'team': BaseballReferenceTeamStatsScraper,
+    'player': BaseballReferencePlayerStatsScraper,
+}
+
+
+def _export_jobs(teams: List[str], years: List[str], players: List[str]) -> List[Tuple[str, ...]]:
+    jobs = [('team', team, year) for team in teams for year in years]
+    jobs.extend(('player', key) for key in players)
+    return jobs
+
+
+def _job_id(job: Tuple[str, ...]) -> str:
+    return ':'.join(job)
+
+
+def _output_name(job: Tuple[str, ...], table: str) -> str:
+    return f"{job[0]}_{table}"
+
+
+def _progress_id(job: Tuple[str, ...], table: str, ext: str) -> str:
+    """
+    Returns the progress entry for one table of one page, e.g. "team_batting.csv:team:LAD:2017".
+    Entries name the output file, so other tables or formats exported into the same directory
+    are not taken as done.
+    """
+    return f"{_output_name(job, table)}{ext}:{_job_id(job)}"
+
+
+def _run_job(job: Tuple[str, ...], tables: List[str]) -> List[Tuple[str, pd.DataFrame]]:
+    """
+    Scrapes the given tables of one team season or player page and returns (output name, DataFrame) pairs.
+    """
+    if job[0] == 'team':
+        _, team, year = job
+        url = create_bbref_team_url(team, year)
+        keys = {'team': team, 'year': year}
+    else:
+        _, key = job
+        url = make_bbref_player_url(key)
+        keys = {'player': key}
+
+    results = []
+    with SCRAPERS[job[0]](url, tables=tables) as scraper:
+        if scraper.soup is None:
+            # Raise so the page is not marked done and a resumed run retries it
+            raise RuntimeError(f"could not fetch {url}")
+        for table in tables:
+            df = scraper._get_dataframe(table)
+            if df is None:
+                continue
+            df = df.copy()
+            for position, (column, value) in enumerate(keys.items()):
+                df.insert(position, column, value)
+            results.append((_output_name(job, table), df))
+    return results
+
+
+def _bounded_map(executor, func, items, limit) -> Iterator:
+    """
+    Yields (item, future) as they complete, with at most `limit` items in flight at once.
+    """
+    items = iter(items)
+    pending = {}
+    for item in items:
+        pending[executor.submit(func, item)] = item
+        if len(pending) >= limit:
+            break
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            yield item, future
+            next_item = next(items, None)
+            if next_item is not None:
+                pending[executor.submit(func, next_item)] = next_item
+
+
+def export(teams: List[str], years: List[str], players: List[str], tables: List[str],
+           output: str, fmt: str = 'csv', workers: int = 4, resume: bool = True) -> Tuple[int, int]:
+    """
+    Scrapes team seasons and player pages and streams their tables to one file per table.
+
+    Parameters:
+    -----------
+    teams, years : List[str]
+        Team abbreviations and seasons; every combination is exported.
+    players : List[str]
+        Baseball-Reference player keys.
+    tables : List[str]
+        Table keys to export, e.g. ["batting", "pitching"].
+    output : str
+        Output directory.
+    fmt : str
+        One of "csv", "jsonl" or "parquet".
+    workers : int
+        Maximum number of pages fetched at the same time.
+    resume : bool
+        Skip tables already exported to the same files by a previous (interrupted) run.
+
+    Returns:
+    --------
+    Tuple[int, int]
+        The number of pages exported and the number of pages that failed in this run.
+    """
+    os.makedirs(output, exist_ok=True)
+    progress_path = os.path.join(output, PROGRESS_FILE)
+    if not resume and os.path.exists(progress_path):
+        os.remove(progress_path)
+    done = set()
+    if os.path.exists(progress_path):
+        with open(progress_path, encoding='utf-8') as f:
+            done = {line.strip() for line in f if line.strip()}
+
+    writer_class, ext = WRITERS[fmt]
+    jobs = _export_jobs(teams, years, players)
+    # (page, tables of it not exported yet)
+    todo = []
+    for job in jobs:
+        job_tables = [table for table in tables if table in SCRAPERS[job[0]].TABLE_IDS
+                      and _progress_id(job, table, ext) not in done]
+        if job_tables:
+            todo.append((job, job_tables))
+    logger.info("Exporting %d page(s), %d already done", len(todo), len(jobs) - len(todo))
+
+    # Output files a previous run wrote to, which are appended to rather than replaced
+    started = {entry.split(':', 1)[0] for entry in done}
+    writers = {}
+    exported = failed = 0
+    # Progress entries (one list per page) whose rows are written but not yet committed
+    pending = []
+
+    def mark_done(progress):
+        # Only mark pages done once their rows are durable on disk
+        for writer in writers.values():
+            writer.commit()
+        progress.writelines(entry + '\n' for entries in pending for entry in entries)
+        progress.flush()
+        pending.clear()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            open(progress_path, 'a', encoding='utf-8') as progress:
+        try:
+            for (job, job_tables), future in _bounded_map(executor, lambda item: _run_job(*item), todo, workers):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error("Failed to export %s: %s", _job_id(job), str(e))
+                    failed += 1
+                    continue
+                for name, df in results:
+                    if name not in writers:
+                        writers[name] = writer_class(os.path.join(output, name + ext),
+                                                     append=name + ext in started)
+                    writers[name].write(df)
+                pending.append([_progress_id(job, table, ext) for table in job_tables])
+                exported += 1
+                logger.info("[%d/%d] exported %s", len(jobs) - len(todo) + exported, len(jobs), _job_id(job))
+                if len(pending) >= writer_class.PAGES_PER_COMMIT:
+                    mark_done(progress)
+        finally:
+            mark_done(progress)
+            for writer in writers.values():
+                writer.close()
+    if failed:
+        logger.warning("%d page(s) failed, run the export again to retry them", failed)
+    return exported, failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='pyball', description="Python3 library for obtaining baseball information")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Export Baseball-Reference tables to files")
+    export_parser.add_argument('--teams', help="Comma separated team abbreviations, e.g. LAD,NYY")
+    export_parser.add_argument('--years', help="Comma separated years or ranges, e.g. 2000-2024")
+    export_parser.add_argument('--players', help="Comma separated Baseball-Reference player keys")
+    export_parser.add_argument('--tables', default='batting,pitching', help="Tables to export (default: batting,pitching)")
+    export_parser.add_argument('--format', choices=sorted(WRITERS), default='csv', dest='fmt')
+    export_parser.add_argument('--output', default='pyball_export', help="Output directory")
+    export_parser.add_argument('--workers', type=int, default=4, help="Pages fetched at the same time")
+    export_parser.add_argument('--no-resume', dest='resume', action='store_false',
+                               help="Start over instead of skipping pages exported by a previous run")
+
+    args = parser.parse_args(argv)
+    teams, years, players = _parse_list(args.teams), _parse_years(args.years), _parse_list(args.players)
+    if bool(teams) != bool(years):
+        parser.error("--teams and --years must be given together")
+    if not teams and not players:
+        parser.error("nothing to export, give --teams/--years and/or --players")
+
+    _, failed = export(teams, years, players, _parse_list(args.tables), args.output, args.fmt, args.workers,
+                       args.resume)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
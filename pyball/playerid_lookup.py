@@ -8,27 +8,26 @@
 from functools import wraps
 import io
 import re
-import diskcache
 import zipfile
 import unicodedata
 import logging
 import pandas as pd
 import requests
 
+from pyball.cache import get_cache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-cache = diskcache.Cache('./.pyball_cache')
-
 def disk_cache(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         key = f"{func.__name__}:{args}:{kwargs}"
-        result = cache.get(key)
+        result = get_cache().get(key)
         if result is None:
             result = func(*args, **kwargs)
-            cache.set(key, result)
+            get_cache().set(key, result)
         return result
     return wrapper
 
@@ -4,18 +4,22 @@
 #
 # Description: File containing functions to obtain player savant data
 
-from typing import Optional
+from typing import Iterable, Optional
+import json
 import logging
 import pandas as pd
 from bs4 import BeautifulSoup
 
-from pyball.utils import read_url, is_savant_url
+from pyball.scraper import TableScraper
+from pyball.utils import (
+    is_savant_url, fetch_url_text, extract_json_payloads, get_negative, record_negative, table_fingerprint,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class SavantScraper:
+class SavantScraper(TableScraper):
     """
     A class for scraping baseball statistics from Baseball Savant website.
 
@@ -40,6 +44,15 @@ class SavantScraper:
 
     get_pitch_tracking() -> Optional[pd.DataFrame]:
         Returns the (Baseball Savant) pitch-specific results for a player as a pandas dataframe.
+
+    close(self) -> None:
+        Releases the parsed page. Tables already extracted stay available.
+
+    table_delta(self, table, consumer) -> Optional[pd.DataFrame]:
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+    commit_delta(self, table, consumer) -> None:
+        Marks the current version of a table as loaded by the consumer.
     """
 
     TABLE_IDS = {
@@ -50,7 +63,112 @@ class SavantScraper:
         "pitch_tracking": "detailedPitches",
     }
 
-    def __init__(self, url: str):
+    # Keys the page's embedded JSON uses for each table's data, tried in order
+    JSON_KEYS = {
+        "percentile": ["percentileRankings", "percentile_rankings"],
+        "pitching": ["statcast_stats_pitching", "statcastPitching"],
+        "batting": ["statcast_glance_batter", "statcastBatting"],
+        "batted_ball": ["playeDiscipline", "plateDiscipline"],
+        "pitch_tracking": ["detailedPitches", "pitchArsenal"],
+    }
+
+    # JSON field -> column of the rendered table, in the rendered order. In JSON mode the
+    # DataFrame only has these columns, so both modes return the same schema.
+    JSON_COLUMNS = {
+        "percentile": {
+            "year": "Year",
+            "stat": "Metric",
+            "value": "Value",
+            "percentile": "Percentile",
+        },
+        "pitching": {
+            "year": "Year",
+            "pitches": "Pitches",
+            "bbe": "Batted Balls",
+            "barrels": "Barrels",
+            "barrel_percent": "Barrel %",
+            "launch_speed": "Exit Velocity",
+            "launch_angle": "Launch Angle",
+            "sweet_spot_percent": "Sweet Spot %",
+            "est_ba": "XBA",
+            "est_slg": "XSLG",
+            "woba": "WOBA",
+            "est_woba": "XWOBA",
+            "hard_hit_percent": "Hard Hit %",
+            "k_percent": "K %",
+            "bb_percent": "BB %",
+            "era": "ERA",
+            "xera": "xERA",
+        },
+        "batting": {
+            "year": "Year",
+            "pa": "PA",
+            "bbe": "Batted Balls",
+            "barrels": "Barrels",
+            "barrel_percent": "Barrel %",
+            "launch_speed": "Exit Velocity",
+            "launch_angle": "Launch Angle",
+            "sweet_spot_percent": "Sweet Spot %",
+            "ba": "BA",
+            "est_ba": "XBA",
+            "slg": "SLG",
+            "est_slg": "XSLG",
+            "woba": "WOBA",
+            "est_woba": "XWOBA",
+            "hard_hit_percent": "Hard Hit %",
+            "k_percent": "K %",
+            "bb_percent": "BB %",
+        },
+        "batted_ball": {
+            "year": "Year",
+            "pitches": "Pitches",
+            "zone_percent": "Zone %",
+            "z_swing_percent": "Zone Swing %",
+            "iz_contact_percent": "Zone Contact %",
+            "oz_swing_percent": "Chase %",
+            "oz_contact_percent": "Chase Contact %",
+            "edge_percent": "Edge %",
+            "f_swing_percent": "1st Pitch Swing %",
+            "swing_percent": "Swing %",
+            "whiff_percent": "Whiff %",
+            "meatball_percent": "Meatball %",
+            "meatball_swing_percent": "Meatball Swing %",
+        },
+        "pitch_tracking": {
+            "year": "Year",
+            "pitch_name": "Pitch Type",
+            "pitch_type": "Pitch Type",
+            "pitches": "#",
+            "pitch_percent": "%",
+            "pa": "PA",
+            "ab": "AB",
+            "hits": "H",
+            "hrs": "HR",
+            "so": "SO",
+            "ba": "BA",
+            "est_ba": "XBA",
+            "slg": "SLG",
+            "est_slg": "XSLG",
+            "woba": "WOBA",
+            "est_woba": "XWOBA",
+            "launch_speed": "EV",
+            "launch_angle": "LA",
+            "release_spin_rate": "Spin",
+            "release_speed": "MPH",
+            "swings": "Swings",
+            "whiffs": "Whiffs",
+            "whiff_percent": "Whiff%",
+            "put_away": "PutAway%",
+        },
+    }
+    # Records must carry at least this many mapped fields to be taken as the table's data
+    MIN_JSON_FIELDS = 2
+    # Missing-table cache id for a failed plain-HTTP fetch, kept apart from the browser's page entry
+    RAW_PAGE_ID = "raw:"
+
+    __slots__ = ("render", "payloads")
+
+    def __init__(self, url: str, tables: Optional[Iterable[str]] = None, render: bool = True):
         """
         Initialize the SavantScraper object.
 
@@ -58,28 +176,129 @@ class SavantScraper:
         -----------
         url : str
             The URL of the Baseball Savant page to scrape.
+        tables : Iterable[str], optional
+            Keys of TABLE_IDS the caller needs. When given, the browser only waits
+            for these tables to load. Defaults to waiting on the whole page.
+        render : bool, optional
+            If False, fetch the raw page over plain HTTP and build the tables from the
+            JSON embedded in its scripts instead of rendering it in a browser. The tables
+            get the rendered column names, but only the columns listed in JSON_COLUMNS. Defaults to True.
         """
         if not is_savant_url(url):
             raise ValueError(f"Invalid team URL: {url}")
-        self.url = url
-        self.soup = self._get_soup()
-        if self.soup is None:
-            logger.error("Failed to initialize SavantScraper with URL: %s", url)
+        self.render = render
+        self.payloads = None
+        super().__init__(url, tables)
+
+    def _load(self) -> None:
+        if self.render:
+            self.soup = self._get_soup()
+            if self.soup is None:
+                logger.error("Failed to initialize SavantScraper with URL: %s", self.url)
+        else:
+            self.payloads = self._get_payloads()
+            if self.payloads is None:
+                logger.error("Failed to initialize SavantScraper with URL: %s", self.url)
+
+    def close(self) -> None:
+        """
+        Releases the parsed page. Tables already extracted stay available;
+        any other table returns None afterwards.
+        """
+        super().close()
+        self.payloads = None
 
-    def _get_soup(self) -> Optional[BeautifulSoup]:
+    def _get_payloads(self) -> Optional[dict]:
         """
-        Retrieve the BeautifulSoup object for the URL.
+        Retrieve the JSON payloads embedded in the raw (unrendered) page.
 
         Returns:
         --------
-        BeautifulSoup or None
-            The BeautifulSoup object representing the HTML content of the URL,
-            or None if retrieval failed.
+        dict or None
+            Script variable name -> decoded JSON value, or None if retrieval failed.
+        """
+        negative = get_negative(self.url, self.RAW_PAGE_ID)
+        if negative is not None:
+            logger.info("Skipping URL that recently failed: %s (%s)", self.url, negative["reason"])
+            return None
+        try:
+            return extract_json_payloads(fetch_url_text(self.url))
+        except Exception as e:
+            logger.warning("Failed to retrieve content from URL: %s (%s)", self.url, str(e))
+            record_negative(self.url, f"Error fetching URL: {e}", self.RAW_PAGE_ID)
+            return None
+
+    @staticmethod
+    def _find_records(payload, key: str):
+        """
+        Search a decoded JSON payload (depth first) for a list of records stored under the given key.
+        """
+        if isinstance(payload, dict):
+            value = payload.get(key)
+            if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+                return value
+            children = payload.values()
+        elif isinstance(payload, list):
+            children = payload
+        else:
+            return None
+        for child in children:
+            records = SavantScraper._find_records(child, key)
+            if records is not None:
+                return records
+        return None
+
+    def _get_json_dataframe(self, table_id: str) -> Optional[pd.DataFrame]:
         """
-        soup = read_url(self.url)
-        if soup is None:
-            logger.warning("Failed to retrieve content from URL: %s", self.url)
-        return soup
+        Build the pandas DataFrame for the given table from the page's embedded JSON.
+
+        Parameters:
+        -----------
+        table_id : str
+            The ID of the table to retrieve.
+
+        Returns:
+        --------
+        pandas.DataFrame or None
+            One row per JSON record with full-precision values and the rendered table's
+            column names (see JSON_COLUMNS), or None if no payload was found.
+        """
+        if self.payloads is None:
+            return None
+        columns = self.JSON_COLUMNS[table_id]
+        for key in self.JSON_KEYS[table_id]:
+            records = self._find_records(self.payloads, key)
+            if records is None:
+                continue
+            fields = set().union(*(record.keys() for record in records))
+            if len(fields & set(columns)) < self.MIN_JSON_FIELDS:
+                logger.info("Ignoring '%s' data for URL: %s, its fields do not match the %s table",
+                            key, self.url, table_id)
+                continue
+            # The column mapping is part of the fingerprint so a changed mapping re-parses the snapshot
+            fingerprint = table_fingerprint(json.dumps([records, columns], sort_keys=True))
+            return self._snapshot_frame(
+                fingerprint, self._snapshot_id(table_id),
+                lambda: self._records_to_frame(table_id, records),
+            )
+        logger.warning(
+            "No embedded data for '%s' found for URL: %s. Is the player the right position?",
+            table_id,
+            self.url,
+        )
+        record_negative(self.url, "no embedded data", self._snapshot_id(table_id))
+        return None
+
+    def _records_to_frame(self, table_id: str, records: list) -> pd.DataFrame:
+        """
+        Builds a DataFrame from JSON records, keeping the mapped fields under the rendered column names.
+        """
+        columns = self.JSON_COLUMNS[table_id]
+        df = pd.DataFrame.from_records(records)
+        df = df[[field for field in columns if field in df.columns]].rename(columns=columns)
+        # Several fields can map to one column (e.g. pitch_name and pitch_type), keep the first
+        df = df.loc[:, ~df.columns.duplicated()]
+        return df.dropna(how="all")
 
     def _find_table(self, table_id: str) -> Optional[BeautifulSoup]:
         """
@@ -101,43 +320,32 @@ class SavantScraper:
             div = self.soup.find("div", id=self.TABLE_IDS[table_id])
             if div is not None:
                 table = div.find("table")
-        if table is None:
-            logger.warning(
-                "Table with id '%s' not found for URL: %s. Is the player the right position?",
-                self.TABLE_IDS[table_id],
-                self.url,
-            )
         return table
 
-    def _get_dataframe(self, table_id: str) -> Optional[pd.DataFrame]:
-        """
-        Get the pandas DataFrame for the table with the given ID.
+    def _snapshot_id(self, table_id: str) -> str:
+        # The JSON and rendered versions have different columns and fail for different
+        # reasons, so their snapshots and missing-table entries are kept apart
+        if not self.render:
+            return "json:" + self.TABLE_IDS[table_id]
+        return self.TABLE_IDS[table_id]
 
-        Parameters:
-        -----------
-        table_id : str
-            The ID of the table to retrieve.
+    def _parse_dataframe(self, table_id: str) -> Optional[pd.DataFrame]:
+        """
+        Get the pandas DataFrame for the table with the given ID, from the rendered
+        page or, if render is False, from the page's embedded JSON.
+        """
+        if not self.render:
+            if self._known_missing(table_id):
+                return None
+            return self._get_json_dataframe(table_id)
+        return super()._parse_dataframe(table_id)
 
-        Returns:
-        --------
-        pandas.DataFrame or None
-            The pandas DataFrame representing the table, or None if the table was not found or parsing failed.
+    def _table_to_frame(self, table_id: str, table: BeautifulSoup) -> Optional[pd.DataFrame]:
         """
-        table = self._find_table(table_id)
-        if table is None:
-            return None
-        try:
-            df = pd.read_html(str(table))[0]
-            df = df.dropna(how="all")
-            return df
-        except ValueError as e:
-            logger.error(
-                "Error parsing %s table (no tables found): %s", table_id, str(e)
-            )
-            return None
-        except Exception as e:
-            logger.error("Unexpected error parsing %s table: %s", table_id, str(e))
-            return None
+        Parses a rendered table and returns it as a pandas DataFrame.
+        """
+        df = pd.read_html(str(table))[0]
+        return df.dropna(how="all")
 
     def get_percentile_stats(self) -> Optional[pd.DataFrame]:
         """
@@ -0,0 +1,250 @@
+# File: scraper.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing the base class shared by the table scrapers
+
+from typing import Callable, Iterable, Optional
+import logging
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from pyball.utils import (
+    read_url, page_awaited, get_negative, record_negative, table_fingerprint, get_table_snapshot,
+    set_table_snapshot, frame_delta, get_delta_baseline, set_delta_baseline,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TableScraper:
+    """
+    Base class for scrapers that extract a fixed set of tables (TABLE_IDS) from one page.
+
+    Handles fetching the page, parsing each table once, releasing the page once every
+    requested table has been extracted, the missing-table cache and table snapshots.
+    Subclasses define TABLE_IDS and _table_to_frame().
+
+    Attributes:
+    -----------
+    url : str
+        The URL of the page to scrape.
+    tables : List[str] or None
+        Keys of TABLE_IDS the caller needs, or None for the whole page.
+
+    Methods:
+    --------
+    close(self) -> None:
+        Releases the parsed page. Tables already extracted stay available.
+
+    table_delta(self, table, consumer) -> Optional[pd.DataFrame]:
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+    commit_delta(self, table, consumer) -> None:
+        Marks the current version of a table as loaded by the consumer.
+    """
+
+    TABLE_IDS = {}
+    DEFAULT_CONSUMER = 'default'
+
+    __slots__ = ('url', 'tables', 'soup', '_results')
+
+    def __init__(self, url: str, tables: Optional[Iterable[str]] = None):
+        """
+        Validates the requested tables and fetches the page.
+
+        Parameters:
+        -----------
+        url : str
+            The URL of the page to scrape. Subclasses check it before calling this.
+        tables : Iterable[str], optional
+            Keys of TABLE_IDS the caller needs. When given, the browser only waits
+            for these tables to load. Defaults to waiting on the whole page.
+
+        Raises:
+        -------
+        ValueError:
+            If tables contains keys that are not in TABLE_IDS.
+        """
+        tables = list(tables) if tables is not None else None
+        if tables is not None and not set(tables) <= set(self.TABLE_IDS):
+            raise ValueError(f"Unknown tables: {sorted(set(tables) - set(self.TABLE_IDS))}")
+        self.url = url
+        self.tables = tables
+        self._results = {}
+        self.soup = None
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _load(self) -> None:
+        """
+        Fetches the page. Called once from __init__.
+        """
+        self.soup = self._get_soup()
+        if self.soup is None:
+            logger.warning("Failed to retrieve content from URL: %s", self.url)
+
+    def close(self) -> None:
+        """
+        Releases the parsed page. Tables already extracted stay available;
+        any other table returns None afterwards.
+        """
+        self.soup = None
+
+    def table_delta(self, table: str, consumer: str = DEFAULT_CONSUMER) -> Optional[pd.DataFrame]:
+        """
+        Returns the rows of a table that were inserted or modified since the consumer last committed it.
+
+        Deltas do not move on by themselves: until commit_delta() is called, every call (from any
+        scraper instance or process) returns the same rows plus any newer changes.
+
+        Parameters:
+        -----------
+        table : str
+            Key of TABLE_IDS, e.g. 'batting'.
+        consumer : str
+            Name of the loader the delta is for. Each consumer keeps its own baseline.
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]
+            The new or changed rows (the whole table if the consumer never committed it),
+            or None if the table is not available.
+        """
+        df = self._get_dataframe(table)
+        if df is None:
+            return None
+        return frame_delta(get_delta_baseline(self.url, self._snapshot_id(table), consumer), df)
+
+    def commit_delta(self, table: str, consumer: str = DEFAULT_CONSUMER) -> None:
+        """
+        Marks the current version of a table as loaded by the consumer. Call it once the rows
+        returned by table_delta() are stored, so a failed load is retried by the next run.
+
+        Parameters:
+        -----------
+        table : str
+            Key of TABLE_IDS, e.g. 'batting'.
+        consumer : str
+            Name of the loader, as passed to table_delta().
+        """
+        df = self._get_dataframe(table)
+        if df is not None:
+            set_delta_baseline(self.url, self._snapshot_id(table), consumer, df)
+
+    def _html_id(self, table: str) -> str:
+        """
+        Returns the HTML id of a table on this page.
+        """
+        return self.TABLE_IDS[table]
+
+    def _snapshot_id(self, table: str) -> str:
+        """
+        Returns the id the table's snapshots, delta baselines and missing-table entries are stored under.
+        """
+        return self._html_id(table)
+
+    def _get_soup(self) -> Optional[BeautifulSoup]:
+        """
+        Retrieves the BeautifulSoup object for the page.
+
+        Returns:
+        --------
+        Optional[BeautifulSoup]:
+            The BeautifulSoup object representing the page, or None if retrieval failed
+            or every requested table is known to be missing.
+        """
+        table_ids = [self._html_id(table) for table in self.tables] if self.tables else None
+        if table_ids and all(get_negative(self.url, table_id) for table_id in table_ids):
+            logger.info("All requested tables are known to be missing for URL: %s", self.url)
+            return None
+        return read_url(self.url, table_ids)
+
+    def _find_table(self, table: str) -> Optional[BeautifulSoup]:
+        """
+        Finds the HTML table element for a key of TABLE_IDS, or None if it is not on the page.
+        """
+        return self.soup.find("table", id=self._html_id(table))
+
+    def _known_missing(self, table: str) -> bool:
+        """
+        Checks the missing-table cache for a key of TABLE_IDS.
+        """
+        negative = get_negative(self.url, self._snapshot_id(table))
+        if negative is not None:
+            logger.info("Skipping %s table for URL: %s (%s)", table, self.url, negative["reason"])
+        return negative is not None
+
+    def _get_dataframe(self, table: str) -> Optional[pd.DataFrame]:
+        """
+        Returns the table for a key of TABLE_IDS, parsing it on first access.
+
+        Once every requested table (all of TABLE_IDS if none were requested) has been
+        extracted, the parsed page is released and only the DataFrames are kept.
+        """
+        if table in self._results:
+            return self._results[table]
+        df = self._parse_dataframe(table)
+        self._results[table] = df
+        if all(key in self._results for key in (self.tables or self.TABLE_IDS)):
+            self.close()
+        return df
+
+    def _parse_dataframe(self, table: str) -> Optional[pd.DataFrame]:
+        """
+        Finds and parses a table of the page.
+
+        Parameters:
+        -----------
+        table : str
+            Key of TABLE_IDS.
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]:
+            The parsed table as a pandas DataFrame, or None if it is missing or parsing failed.
+        """
+        if self._known_missing(table) or self.soup is None:
+            return None
+
+        element = self._find_table(table)
+        if element is None:
+            logger.warning("%s table not found for URL: %s", table.capitalize(), self.url)
+            # Only a page rendered waiting for this table (or the whole page) proves it is missing
+            if page_awaited(self.url, self._html_id(table)):
+                record_negative(self.url, "table not found", self._snapshot_id(table))
+            return None
+
+        try:
+            return self._snapshot_frame(table_fingerprint(element), self._snapshot_id(table),
+                                        lambda: self._table_to_frame(table, element))
+        except Exception as e:
+            logger.error("Error parsing %s table: %s", table, str(e))
+            return None
+
+    def _snapshot_frame(self, fingerprint: str, snapshot_id: str,
+                        parse: Callable[[], Optional[pd.DataFrame]]) -> Optional[pd.DataFrame]:
+        """
+        Returns the previously parsed table if its fingerprint is unchanged, otherwise parses it
+        and stores the new snapshot.
+        """
+        snapshot = get_table_snapshot(self.url, snapshot_id)
+        if snapshot is not None and snapshot["hash"] == fingerprint:
+            # Markup unchanged since the last refresh, reuse the previously parsed table
+            return snapshot["frame"]
+        df = parse()
+        if df is not None:
+            set_table_snapshot(self.url, snapshot_id, fingerprint, df)
+        return df
+
+    def _table_to_frame(self, table: str, element: BeautifulSoup) -> Optional[pd.DataFrame]:
+        """
+        Converts a table element to a pandas DataFrame. Implemented by each scraper.
+        """
+        raise NotImplementedError
@@ -0,0 +1,269 @@
+# File: stats.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing vectorized derived-stat calculations over batches of scraped tables
+
+from typing import Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Approximate league-average wOBA linear weights. Pass per-season weights for exact values.
+DEFAULT_WOBA_WEIGHTS = {
+    'BB': 0.69,
+    'HBP': 0.72,
+    '1B': 0.88,
+    '2B': 1.25,
+    '3B': 1.59,
+    'HR': 2.04,
+}
+
+BATTING_COUNTING_STATS = ['G', 'PA', 'AB', 'R', 'H', '2B', '3B', 'HR', 'RBI', 'SB', 'CS', 'BB', 'IBB', 'SO',
+                          'HBP', 'SH', 'SF', 'GDP', 'TB']
+PITCHING_COUNTING_STATS = ['W', 'L', 'G', 'GS', 'SV', 'H', 'R', 'ER', 'HR', 'BB', 'IBB', 'SO', 'HBP', 'BK',
+                           'WP', 'BF']
+
+# bbref career tables add a combined row ("TOT", or "2TM", "3TM", ...) next to a traded player's stints
+TEAM_COLUMNS = ['Tm', 'Team']
+MULTI_TEAM_PATTERN = r'^(?:TOT|\d+TM)$'
+
+
+def _col(df, name):
+    """
+    Function to get a column as a float array, or zeros if the table does not have it
+    """
+    if name in df.columns:
+        return df[name].to_numpy(dtype=float, na_value=np.nan)
+    return np.zeros(len(df))
+
+
+def _ratio(numerator, denominator):
+    """
+    Function to divide two arrays, giving NaN where the denominator is zero
+    """
+    out = np.full(len(numerator), np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def to_numeric(df, threshold=0.9):
+    """
+    Function to convert the text columns of a scraped table to numbers where they hold numbers
+
+    Parameters
+    ----------
+    df: DataFrame
+        scraped table, usually all strings
+    threshold: float
+        fraction of the non-empty values that must parse for a column to be converted
+
+    Returns
+    ----------
+    DataFrame
+        copy of df with numeric columns converted ("25.3%" becomes 25.3)
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        text = df[column].astype(str).str.strip().str.rstrip('%')
+        present = df[column].notna() & (text != '')
+        if not present.any():
+            continue
+        numbers = pd.to_numeric(text.where(present), errors='coerce')
+        if numbers[present].notna().mean() >= threshold:
+            df[column] = numbers
+    return df
+
+
+def stack_tables(tables: Mapping, key: str = 'player', season_col: Optional[str] = 'Year'):
+    """
+    Function to stack many scraped tables into one typed DataFrame
+
+    Parameters
+    ----------
+    tables: Mapping
+        key (e.g. bbref_key or (team, year)) -> DataFrame from a scraper
+    key: String
+        name of the column holding each table's key
+    season_col: String, optional
+        if given, rows whose value in this column is not a four digit year (career totals,
+        "162 Game Avg." and repeated header rows) are dropped and the column is renamed "season"
+
+    Returns
+    ----------
+    DataFrame
+        one row per table row, with numeric columns converted. Multi-team season totals
+        (team "TOT", "2TM", ...) are dropped so aggregate() does not count those seasons twice.
+    """
+    frames = [df.assign(**{key: [k] * len(df)}) for k, df in tables.items() if df is not None]
+    if not frames:
+        return pd.DataFrame()
+    stacked = pd.concat(frames, ignore_index=True)
+    for team_col in TEAM_COLUMNS:
+        if team_col in stacked.columns:
+            combined = stacked[team_col].astype(str).str.strip().str.fullmatch(MULTI_TEAM_PATTERN)
+            stacked = stacked[~combined]
+    stacked = stacked[[key] + [column for column in stacked.columns if column != key]]
+    if season_col is not None and season_col in stacked.columns:
+        seasons = stacked[season_col].astype(str).str.extract(r'^(\d{4})', expand=False)
+        stacked = stacked[seasons.notna()].assign(**{season_col: seasons.dropna().astype(int)})
+        stacked = stacked.rename(columns={season_col: 'season'})
+    return to_numeric(stacked).reset_index(drop=True)
+
+
+def _weights_by_row(df, weights, season_col):
+    """
+    Function to line up wOBA weights with every row, by season
+    """
+    names = list(DEFAULT_WOBA_WEIGHTS)
+    if weights is None:
+        weights = DEFAULT_WOBA_WEIGHTS
+    if not isinstance(weights, pd.DataFrame) and set(names) <= set(weights):
+        # One set of weights for every row
+        return {name: np.full(len(df), float(weights[name])) for name in names}
+    if season_col not in df.columns:
+        raise ValueError(f"Per-season weights need a '{season_col}' column")
+
+    table = weights if isinstance(weights, pd.DataFrame) else pd.DataFrame.from_dict(weights, orient='index')
+    table = table.reindex(columns=names)
+    table.index = table.index.astype(int)
+    # Seasons without weights fall back to the defaults
+    per_row = table.reindex(df[season_col].to_numpy()).fillna(value=DEFAULT_WOBA_WEIGHTS)
+    return {name: per_row[name].to_numpy(dtype=float) for name in names}
+
+
+def batting_rates(df, weights=None, season_col='season'):
+    """
+    Function to add rate and advanced batting stats to a (stacked) batting table
+
+    Parameters
+    ----------
+    df: DataFrame
+        batting table with bbref column names (PA, AB, H, 2B, 3B, HR, BB, IBB, HBP, SF, SO)
+    weights: Mapping or DataFrame, optional
+        wOBA weights (BB, HBP, 1B, 2B, 3B, HR), either one mapping for every row or
+        season -> mapping (or a DataFrame indexed by season). Defaults to DEFAULT_WOBA_WEIGHTS.
+    season_col: String
+        column holding the season, used to look up per-season weights
+
+    Returns
+    ----------
+    DataFrame
+        copy of df with K%, BB%, K-BB%, ISO, BABIP and wOBA columns
+    """
+    df = df.copy()
+    pa, ab, h, hr, so = (_col(df, name) for name in ('PA', 'AB', 'H', 'HR', 'SO'))
+    doubles, triples = _col(df, '2B'), _col(df, '3B')
+    bb, ibb, hbp, sf = (_col(df, name) for name in ('BB', 'IBB', 'HBP', 'SF'))
+    singles = h - doubles - triples - hr
+    w = _weights_by_row(df, weights, season_col)
+
+    df['K%'] = 100 * _ratio(so, pa)
+    df['BB%'] = 100 * _ratio(bb, pa)
+    df['K-BB%'] = df['K%'] - df['BB%']
+    df['ISO'] = _ratio(doubles + 2 * triples + 3 * hr, ab)
+    df['BABIP'] = _ratio(h - hr, ab - so - hr + sf)
+    df['wOBA'] = _ratio(
+        w['BB'] * (bb - ibb) + w['HBP'] * hbp + w['1B'] * singles + w['2B'] * doubles
+        + w['3B'] * triples + w['HR'] * hr,
+        ab + bb - ibb + sf + hbp,
+    )
+    return df
+
+
+def innings_to_outs(ip):
+    """
+    Function to convert innings pitched in baseball notation (6.1 = 6 1/3 innings) to outs
+    """
+    ip = np.asarray(ip, dtype=float)
+    whole = np.floor(ip)
+    return whole * 3 + np.round((ip - whole) * 10)
+
+
+def pitching_rates(df):
+    """
+    Function to add rate stats to a (stacked) pitching table
+
+    Parameters
+    ----------
+    df: DataFrame
+        pitching table with bbref column names (IP, BF, SO, BB, HBP, HR)
+
+    Returns
+    ----------
+    DataFrame
+        copy of df with K%, BB%, K-BB%, K/9, BB/9 and HR/9 columns
+    """
+    df = df.copy()
+    bf, so, bb, hr = (_col(df, name) for name in ('BF', 'SO', 'BB', 'HR'))
+    innings = innings_to_outs(_col(df, 'IP')) / 3
+
+    df['K%'] = 100 * _ratio(so, bf)
+    df['BB%'] = 100 * _ratio(bb, bf)
+    df['K-BB%'] = df['K%'] - df['BB%']
+    df['K/9'] = 9 * _ratio(so, innings)
+    df['BB/9'] = 9 * _ratio(bb, innings)
+    df['HR/9'] = 9 * _ratio(hr, innings)
+    return df
+
+
+def pitch_mix(df, by: Sequence[str] = ('player', 'season'), pitches_col='#', whiffs_col='Whiffs',
+              swings_col='Swings'):
+    """
+    Function to add per-pitch-type usage and whiff shares to a (stacked) pitch tracking table
+
+    Parameters
+    ----------
+    df: DataFrame
+        one row per player, season and pitch type (e.g. stacked get_pitch_tracking() results)
+    by: Sequence[String]
+        columns identifying a pitcher's arsenal; usage shares add up to 100 within each group
+    pitches_col: String
+        column with the number of pitches of each type
+    whiffs_col, swings_col: String
+        columns with whiffs and swings of each type (whiff share is skipped if either is missing)
+
+    Returns
+    ----------
+    DataFrame
+        copy of df with Usage% and (when possible) Whiff% columns
+    """
+    df = df.copy()
+    by = [column for column in by if column in df.columns]
+    pitches = _col(df, pitches_col)
+    totals = df.assign(_pitches=pitches).groupby(by, sort=False)['_pitches'].transform('sum') if by \
+        else pd.Series(pitches.sum(), index=df.index)
+    df['Usage%'] = 100 * _ratio(pitches, totals.to_numpy(dtype=float))
+    if whiffs_col in df.columns and swings_col in df.columns:
+        df['Whiff%'] = 100 * _ratio(_col(df, whiffs_col), _col(df, swings_col))
+    return df
+
+
+def aggregate(df, by: Sequence[str] = ('player', 'season'), counting_stats: Optional[Sequence[str]] = None):
+    """
+    Function to sum counting stats per group (e.g. a player's stints with several teams in one season)
+
+    Rate stats are not summed; run batting_rates() or pitching_rates() on the result to recompute them.
+
+    Parameters
+    ----------
+    df: DataFrame
+        stacked table
+    by: Sequence[String]
+        columns to group by
+    counting_stats: Sequence[String], optional
+        columns to sum. Defaults to the bbref batting and pitching counting stats present in df.
+
+    Returns
+    ----------
+    DataFrame
+        one row per group
+    """
+    if counting_stats is None:
+        counting_stats = list(dict.fromkeys(BATTING_COUNTING_STATS + PITCHING_COUNTING_STATS))
+    columns = [column for column in counting_stats if column in df.columns]
+    grouped = df.groupby(list(by), sort=True)[columns].sum(min_count=1)
+    if 'IP' in df.columns:
+        # Sum innings as outs, then convert back to baseball notation
+        outs = pd.Series(innings_to_outs(_col(df, 'IP')), index=df.index).groupby([df[c] for c in by]).sum()
+        grouped['IP'] = outs // 3 + (outs % 3) / 10
+    return grouped.reset_index()
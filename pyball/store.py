@@ -0,0 +1,415 @@
+# File: store.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing a local columnar store of every table pyball has scraped,
+# queryable across players and seasons without the network or the HTML parser.
+
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+import hashlib
+import json
+import logging
+import operator
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+
+from pyball.cache import get_cache
+from pyball.stats import to_numeric
+from pyball.baseball_reference_player import BaseballReferencePlayerStatsScraper
+from pyball.baseball_reference_team import BaseballReferenceTeamStatsScraper
+from pyball.baseball_reference_gamelog import BaseballReferenceGameLogScraper
+from pyball.savant import SavantScraper
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+SEASON_COLUMNS = ['Year', 'Season', 'season', 'year', 'game_year']
+
+# Query parameters that name the player or season rather than the version of the page
+ENTITY_PARAMS = ['year', 'id', 'team']
+
+# Savant tables built from the page's embedded JSON (render=False) are stored apart from the
+# rendered ones, e.g. "json:detailedPitches" as the "json_detailedPitches" table
+JSON_PREFIX = 'json:'
+JSON_TABLE_PREFIX = 'json_'
+
+
+def _table_aliases() -> dict:
+    """
+    Maps scraper table keys to HTML table ids, for keys that only one scraper uses (e.g. "pitch_tracking").
+    """
+    seen = {}
+    for scraper in (BaseballReferencePlayerStatsScraper, BaseballReferenceTeamStatsScraper,
+                    BaseballReferenceGameLogScraper, SavantScraper):
+        for key, table_id in scraper.TABLE_IDS.items():
+            seen.setdefault(key, set()).add(table_id)
+    return {key: ids.pop() for key, ids in seen.items() if len(ids) == 1}
+
+
+TABLE_ALIASES = _table_aliases()
+
+
+def entity_from_url(url: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Returns the player key (bbref key, team abbreviation or MLBAM id) and, when the URL
+    is for a single season, the season of a scraped page.
+    """
+    parsed = urlparse(url)
+    params = parse_qs(parsed.query)
+    year = params.get('year', [None])[0]
+    season = int(year) if year and year.isdigit() else None
+    if 'baseballsavant' in url:
+        match = re.search(r'(\d+)/?$', parsed.path)
+        return (match.group(1) if match else None), season
+    if 'id' in params:
+        return params['id'][0], season
+    if 'team' in params:
+        return params['team'][0], season
+    match = re.search(r'/players/\w/(\w+)\.shtml$', parsed.path)
+    if match:
+        return match.group(1), season
+    match = re.search(r'/teams/(\w+)/(\d{4})\.shtml$', parsed.path)
+    if match:
+        return match.group(1), int(match.group(2))
+    return None, season
+
+
+def page_from_url(url: str) -> str:
+    """
+    Returns the version of a player's page a URL is for, from the query parameters that
+    do not name the player or season (e.g. "playerType=pitcher&stats=statcast-r-pitching-mlb"
+    for a Savant pitcher page), or "" if there are none.
+    """
+    params = parse_qs(urlparse(url).query)
+    return urlencode(sorted((key, value) for key, values in params.items()
+                            if key not in ENTITY_PARAMS for value in values))
+
+
+class ColumnStore:
+    """
+    A class for storing scraped tables column by column, partitioned by table, player, season and page.
+
+    Each partition keeps one file per column plus the column's min/max in the table's index, so a
+    query only reads the partitions its player/season and predicates can match, and only the
+    columns it filters on or returns.
+
+    Attributes:
+    -----------
+    path : str
+        The directory the store is kept in.
+
+    Methods:
+    --------
+    write(table, player, season, df, page) -> int:
+        Stores (or replaces) one partition.
+
+    ingest() -> int:
+        Stores every table parsed so far, from the cached table snapshots.
+
+    query(table, filter, columns, players, seasons) -> pd.DataFrame:
+        Returns the matching rows of a table across every stored partition.
+
+    tables() -> List[str]:
+        Returns the names of the stored tables.
+    """
+
+    INDEX_FILE = '_index.json'
+    INGESTED_FILE = '_ingested.json'
+
+    def __init__(self, path: str = './.pyball_store'):
+        """
+        Initializes a ColumnStore instance.
+
+        Parameters:
+        -----------
+        path : str
+            The directory to keep the store in. Created if it does not exist.
+        """
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+        self._indexes = {}
+
+    @staticmethod
+    def _resolve(table: str) -> str:
+        """
+        Returns the stored table name for a table id, scraper table key or snapshot id
+        ("json:pitch_tracking" and "json:detailedPitches" both give "json_detailedPitches").
+        """
+        if table.startswith(JSON_PREFIX):
+            table = table[len(JSON_PREFIX):]
+            return JSON_TABLE_PREFIX + TABLE_ALIASES.get(table, table)
+        return TABLE_ALIASES.get(table, table)
+
+    def _index_path(self, table: str) -> str:
+        return os.path.join(self.path, table, self.INDEX_FILE)
+
+    def _load_index(self, table: str) -> dict:
+        if table not in self._indexes:
+            path = self._index_path(table)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    self._indexes[table] = json.load(f)
+            else:
+                self._indexes[table] = {}
+        return self._indexes[table]
+
+    def _save_index(self, table: str):
+        path = self._index_path(table)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._indexes[table], f)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _partition_id(player, season, page='') -> str:
+        key = f"{player}:{season}" + (f":{page}" if page else '')
+        return hashlib.md5(key.encode()).hexdigest()
+
+    @staticmethod
+    def _column_stats(series: pd.Series) -> dict:
+        if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series) or series.isna().all():
+            return {}
+        return {'min': float(series.min()), 'max': float(series.max())}
+
+    def tables(self) -> List[str]:
+        """
+        Returns the names (HTML table ids) of the stored tables.
+        """
+        return sorted(name for name in os.listdir(self.path) if os.path.exists(self._index_path(name)))
+
+    def write(self, table: str, player, season, df: pd.DataFrame, page: str = '') -> int:
+        """
+        Stores one partition, replacing any previous version of it.
+
+        Parameters:
+        -----------
+        table : str
+            Name of the table (HTML table id or scraper table key).
+        player : str
+            Player key (bbref key, team abbreviation or MLBAM id).
+        season : int, optional
+            Season of the rows, or None for multi-season tables without a season column.
+        df : pd.DataFrame
+            The rows to store. Text columns holding numbers are stored as numbers.
+        page : str, optional
+            Version of the player's page the rows come from (see page_from_url()), so e.g. a
+            player's Savant batter and pitcher pages are stored side by side.
+
+        Returns:
+        --------
+        int
+            Number of rows stored.
+        """
+        table = self._resolve(table)
+        df = df.copy()
+        df.columns = [' '.join(map(str, column)) if isinstance(column, tuple) else str(column)
+                      for column in df.columns]
+        df = to_numeric(df.loc[:, ~pd.Index(df.columns).duplicated()]).reset_index(drop=True)
+
+        partition = self._partition_id(player, season, page)
+        directory = os.path.join(self.path, table, partition)
+        tmp_directory = directory + '.tmp'
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+        columns = {}
+        for position, column in enumerate(df.columns):
+            filename = f"c{position}.pkl"
+            df[column].to_pickle(os.path.join(tmp_directory, filename))
+            columns[column] = dict(file=filename, **self._column_stats(df[column]))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+
+        index = self._load_index(table)
+        index[partition] = {'player': str(player), 'season': season, 'page': page, 'rows': len(df),
+                            'columns': columns}
+        self._save_index(table)
+        return len(df)
+
+    def ingest(self) -> int:
+        """
+        Stores every table parsed so far, read from the cached table snapshots (no network, no HTML parsing).
+
+        Tables with a season column are split into one partition per season. Snapshots that did not
+        change since the last ingest are skipped.
+
+        Returns:
+        --------
+        int
+            Number of snapshots stored.
+        """
+        ingested_path = os.path.join(self.path, self.INGESTED_FILE)
+        ingested = {}
+        if os.path.exists(ingested_path):
+            with open(ingested_path, encoding='utf-8') as f:
+                ingested = json.load(f)
+
+        cache = get_cache()
+        keys = list(cache.iterkeys('table:'))
+        stored = 0
+        for key in keys:
+            snapshot = cache.get(key)
+            if snapshot is None or 'url' not in snapshot or ingested.get(key) == snapshot['updated_at']:
+                continue
+            player, season = entity_from_url(snapshot['url'])
+            page = page_from_url(snapshot['url'])
+            table = self._resolve(snapshot['table_id'])
+            df = snapshot['frame']
+            season_col = next((column for column in SEASON_COLUMNS if column in df.columns), None)
+            if season is None and season_col is not None:
+                seasons = pd.to_numeric(df[season_col].astype(str).str[:4], errors='coerce')
+                for value, rows in df.groupby(seasons.fillna(-1).astype(int)):
+                    self.write(table, player, None if value == -1 else int(value), rows, page)
+            else:
+                self.write(table, player, season, df, page)
+            ingested[key] = snapshot['updated_at']
+            stored += 1
+
+        with open(ingested_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(ingested, f)
+        os.replace(ingested_path + '.tmp', ingested_path)
+        logger.info("Ingested %d table snapshot(s)", stored)
+        return stored
+
+    @staticmethod
+    def _may_match(entry: dict, predicates: List[Tuple[str, str, Any]]) -> bool:
+        """
+        Uses a partition's column min/max to rule it out without reading it.
+        """
+        for column, op, value in predicates:
+            if column not in entry['columns']:
+                return False
+            stats = entry['columns'][column]
+            if 'min' not in stats or not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            low, high = stats['min'], stats['max']
+            if (op == '>' and high <= value) or (op == '>=' and high < value) \
+                    or (op == '<' and low >= value) or (op == '<=' and low > value) \
+                    or (op == '==' and not low <= value <= high):
+                return False
+        return True
+
+    def query(self, table: str, filter: Optional[Sequence[Tuple[str, str, Any]]] = None,
+              columns: Optional[Sequence[str]] = None, players: Optional[Iterable] = None,
+              seasons: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Returns the matching rows of a table across every stored partition.
+
+        Parameters:
+        -----------
+        table : str
+            Name of the table: an HTML table id (e.g. "detailedPitches") or a scraper table key
+            used by only one scraper (e.g. "pitch_tracking"). Prefix it with "json:" for Savant
+            tables scraped with render=False.
+        filter : Sequence[Tuple[str, str, Any]], optional
+            Predicates (column, op, value) that must all hold. op is one of ==, !=, <, <=, >, >= or "in".
+        columns : Sequence[str], optional
+            Columns to return. Defaults to every column.
+        players : Iterable, optional
+            Only read these players' partitions.
+        seasons : Iterable[int], optional
+            Only read these seasons' partitions.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The matching rows, with "player", "season" and "page" columns first.
+        """
+        table = self._resolve(table)
+        predicates = [tuple(predicate) for predicate in (filter or [])]
+        for _, op, _ in predicates:
+            if op not in OPERATORS and op != 'in':
+                raise ValueError(f"Unknown operator: {op}")
+        players = {str(player) for player in players} if players is not None else None
+        seasons = set(seasons) if seasons is not None else None
+
+        frames = []
+        for partition, entry in self._load_index(table).items():
+            if players is not None and entry['player'] not in players:
+                continue
+            if seasons is not None and entry['season'] not in seasons:
+                continue
+            if not self._may_match(entry, predicates):
+                continue
+
+            directory = os.path.join(self.path, table, partition)
+            loaded = {}
+
+            def column_values(name):
+                if name not in loaded:
+                    loaded[name] = pd.read_pickle(os.path.join(directory, entry['columns'][name]['file']))
+                return loaded[name]
+
+            mask = np.ones(entry['rows'], dtype=bool)
+            for column, op, value in predicates:
+                values = column_values(column)
+                matched = values.isin(list(value)) if op == 'in' else OPERATORS[op](values, value)
+                mask &= matched.fillna(False).to_numpy(dtype=bool)
+                if not mask.any():
+                    break
+            if not mask.any():
+                continue
+
+            wanted = [name for name in (columns if columns is not None else entry['columns'])
+                      if name in entry['columns']]
+            frame = pd.DataFrame({name: column_values(name)[mask].reset_index(drop=True) for name in wanted})
+            frame.insert(0, 'page', entry.get('page', ''))
+            frame.insert(0, 'season', entry['season'])
+            frame.insert(0, 'player', entry['player'])
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['player', 'season', 'page'] + list(columns or []))
+        return pd.concat(frames, ignore_index=True)
+
+
+_store: Optional[ColumnStore] = None
+
+
+def get_store() -> ColumnStore:
+    """
+    Returns the default store (./.pyball_store), creating it on first use.
+    """
+    global _store
+    if _store is None:
+        _store = ColumnStore()
+    return _store
+
+
+def set_store(store: ColumnStore) -> None:
+    """
+    Sets the store used by the module level query() and ingest().
+    """
+    global _store
+    _store = store
+
+
+def ingest() -> int:
+    """
+    Stores every table parsed so far in the default store. See ColumnStore.ingest().
+    """
+    return get_store().ingest()
+
+
+def query(table: str, filter: Optional[Sequence[Tuple[str, str, Any]]] = None,
+          columns: Optional[Sequence[str]] = None, players: Optional[Iterable] = None,
+          seasons: Optional[Iterable[int]] = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Queries the default store. See ColumnStore.query().
+
+    If refresh is True, tables parsed since the last ingest are stored first.
+    """
+    if refresh:
+        ingest()
+    return get_store().query(table, filter=filter, columns=columns, players=players, seasons=seasons)
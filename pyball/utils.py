@@ -4,9 +4,12 @@
 #
 # Description: File containing various utility functions used in pyball
 
+import re
+import json
 import time
 import hashlib
-import diskcache
+import requests
+import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -16,67 +19,396 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
-cache = diskcache.Cache('./.pyball_cache')
+from pyball.cache import get_cache
 
+# Resources the headless browser never needs to build the stats tables
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*googletagservices.com*", "*amazon-adsystem.com*",
+    "*adnxs.com*", "*adsafeprotected.com*", "*moatads.com*", "*scorecardresearch.com*",
+    "*facebook.net*", "*quantserve.com*", "*chartbeat.com*", "*pubmatic.com*",
+    "*rubiconproject.com*", "*criteo.com*", "*taboola.com*", "*outbrain.com*",
+]
 
+# Set to False to fetch pages over plain HTTP instead of rendering them in headless Chrome
+# (enough for Baseball-Reference, whose tables are in the served HTML)
+USE_BROWSER = True
 
-def fetch_url_content(url, cache_time=86400):
+# Selectors to wait on when the caller does not say which tables it needs
+DEFAULT_WAIT_SELECTORS = {
+    "baseball-reference.com": "div#inner_nav",
+    "baseballsavant": "div.pitchingBreakdown table#detailedPitches",
+}
+
+# Tables the default selector waits for on sites that render their tables after the page loads
+# (Baseball-Reference serves them in the HTML, so its default wait covers the whole page)
+DEFAULT_WAIT_TABLES = {
+    "baseballsavant": ["detailedPitches"],
+}
+
+
+def _http_get(url):
+    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (pyball)"}, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+
+def _make_driver():
+    """
+    Function to create a headless Chrome driver that skips images, stylesheets, fonts and ad/tracking hosts
     """
-    Function to read a URL and return the BeautifulSoup object, using disk cache when available
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Return from driver.get() once the DOM is parsed instead of after every subresource has loaded
+    options.page_load_strategy = "eager"
+    service = Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+
+def _wait_for_tables(driver, url, table_ids=None, timeout=30):
+    """
+    Function to wait until the requested tables (or the site's default element) are in the DOM
+    """
+    wait = WebDriverWait(driver, timeout)
+    if table_ids:
+        # Savant renders some tables inside a div carrying the id, so accept either form
+        wait.until(EC.all_of(*[
+            EC.presence_of_element_located((By.CSS_SELECTOR, f"table#{table_id}, #{table_id} table"))
+            for table_id in table_ids
+        ]))
+        return
+
+    for site, selector in DEFAULT_WAIT_SELECTORS.items():
+        if site in url:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            return
+
+    # Unknown host, wait for the document to finish loading
+    WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+
+def _default_wait_tables(url):
+    for site, table_ids in DEFAULT_WAIT_TABLES.items():
+        if site in url:
+            return table_ids
+    return None
+
+
+def fetch_url_content(url, cache_time=86400, table_ids=None):
+    """
+    Function to read a URL and return the BeautifulSoup object, using the cache when available
+
+    If table_ids is given, the browser only waits until those tables are in the DOM.
+    A cached page is reused if it was fetched waiting on the whole page, or on a
+    superset of the requested tables (the site's default tables if none are given).
     """
     # Create a unique key for this URL
     url_hash = hashlib.md5(url.encode()).hexdigest()
+    # Tables the page is rendered waiting for, None for the whole page
+    wanted = table_ids if table_ids is not None else _default_wait_tables(url)
 
     # Check if we have a valid cached version
-    cached_data = cache.get(url_hash)
+    cached_data = get_cache().get(url_hash)
     if cached_data is not None:
-        timestamp, html = cached_data
-        if time.time() - timestamp < cache_time:
+        timestamp, html, awaited = (cached_data + (None,))[:3]
+        covers_tables = awaited is None or (wanted is not None and set(wanted) <= set(awaited))
+        if time.time() - timestamp < cache_time and covers_tables:
             print("Using cached data")
             return BeautifulSoup(html, "html.parser")
 
     # If no valid cache, fetch the content
     print("Fetching from URL")
-    options = Options()
-    options.add_argument("--headless")
-    service = Service()
-    driver = webdriver.Chrome(service=service, options=options)
+    if not USE_BROWSER:
+        # The served page is all there is, so it covers every table
+        html = _http_get(url)
+        wanted = None
+    else:
+        driver = _make_driver()
 
-    try:
-        driver.get(url)
-
-        # Specific handling for different sites
-        if "baseball-reference.com" in url:
-            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div#inner_nav')))
-        elif "baseballsavant" in url:
-            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.pitchingBreakdown table#detailedPitches")))
-        else:
-            # Default wait for network idle
-            time.sleep(10)  # Simple wait as Selenium doesn't have a built-in "networkidle" equivalent
-
-        html = driver.page_source
-    except TimeoutException:
-        html = driver.page_source
-    finally:
-        driver.quit()
+        try:
+            driver.get(url)
+            _wait_for_tables(driver, url, table_ids)
+            html = driver.page_source
+        except TimeoutException:
+            html = driver.page_source
+        finally:
+            driver.quit()
 
     if html:
         # Cache the new content
-        cache[url_hash] = (time.time(), html)
+        get_cache().set(url_hash, (time.time(), html, list(wanted) if wanted else None))
         return BeautifulSoup(html, "html.parser")
     else:
         return None
 
-def read_url(url):
+NEGATIVE_CACHE_TTL = 3600
+
+
+def _negative_key(url, table_id=None):
+    return "neg:" + hashlib.md5(url.encode()).hexdigest() + ":" + (table_id or "")
+
+
+def record_negative(url, reason, table_id=None, ttl=NEGATIVE_CACHE_TTL):
+    """
+    Function to remember, for ttl seconds, that a page failed to load or that a table is absent from it
+
+    Parameters
+    ----------
+    url: String
+        url of the page
+    reason: String
+        why the page or table is unavailable
+    table_id: String, optional
+        HTML id of the missing table, or None if the whole page failed
+    ttl: int, optional
+        number of seconds to keep the entry for
+    """
+    entry = {"url": url, "table_id": table_id, "reason": reason, "recorded_at": time.time()}
+    get_cache().set(_negative_key(url, table_id), entry, expire=ttl)
+
+
+def get_negative(url, table_id=None):
+    """
+    Function to look up a live negative cache entry for a page (or one of its tables)
+
+    Returns
+    ----------
+    dict or None
+        url, table_id, reason and recorded_at of the entry, or None if there is none
+    """
+    return get_cache().get(_negative_key(url, table_id))
+
+
+def negative_entries():
+    """
+    Function to list every live negative cache entry
+
+    Returns
+    ----------
+    list
+        one dict (url, table_id, reason, recorded_at) per entry
+    """
+    keys = list(get_cache().iterkeys("neg:"))
+    return list(get_cache().get_many(keys).values())
+
+
+def purge_negative(url=None):
+    """
+    Function to delete negative cache entries, for one page (and its tables) or for every page
+
+    Returns
+    ----------
+    int
+        number of entries deleted
+    """
+    prefix = "neg:" if url is None else _negative_key(url)
+    keys = list(get_cache().iterkeys(prefix))
+    for key in keys:
+        get_cache().delete(key)
+    return len(keys)
+
+
+def read_url(url, table_ids=None):
     """
     Function to read a URL, using cache when available
+
+    Pages that recently failed to load are not fetched again until their negative cache entry expires.
     """
+    negative = get_negative(url)
+    if negative is not None:
+        print(f"Skipping URL that recently failed: {negative['reason']}")
+        return None
+
     try:
-        return fetch_url_content(url)
+        soup = fetch_url_content(url, table_ids=table_ids)
     except Exception as e:
         print(f"Error fetching URL: {e}")
+        record_negative(url, f"Error fetching URL: {e}")
         return None
 
+    if soup is None:
+        record_negative(url, "Empty page")
+    return soup
+
+
+def page_awaited(url, table_id):
+    """
+    Function to check whether the cached copy of a page was rendered waiting for a table
+
+    A table missing from a page that was only rendered until other tables appeared may simply
+    not have loaded yet, so it should not be recorded as missing.
+
+    Parameters
+    ----------
+    url: String
+        url of the page
+    table_id: String
+        HTML id of the table
+
+    Returns
+    ----------
+    bool
+        True if the cached page was rendered waiting for the table or for the whole page
+    """
+    cached_data = get_cache().get(hashlib.md5(url.encode()).hexdigest())
+    if cached_data is None:
+        return False
+    awaited = (tuple(cached_data) + (None,))[2]
+    return awaited is None or table_id in awaited
+
+
+def table_fingerprint(table):
+    """
+    Function to hash the markup of a single extracted table (not the whole page)
+
+    Parameters
+    ----------
+    table: BeautifulSoup or String
+        the table element, or any other serializable representation of the table
+
+    Returns
+    ----------
+    String
+        sha1 hex digest of the table's markup
+    """
+    return hashlib.sha1(str(table).encode()).hexdigest()
+
+
+# Snapshots only save re-parsing, so an expired one costs a parse. An expired (or evicted)
+# delta baseline makes the next delta the whole table, so rows are re-sent but never lost.
+TABLE_SNAPSHOT_TTL = 30 * 86400
+DELTA_BASELINE_TTL = 180 * 86400
+
+
+def _snapshot_key(url, table_id):
+    return "table:" + hashlib.md5(url.encode()).hexdigest() + ":" + table_id
+
+
+def get_table_snapshot(url, table_id):
+    """
+    Function to get the last parsed version of a table and the fingerprint it was parsed from
+
+    Returns
+    ----------
+    dict or None
+        {"url": url, "table_id": table_id, "hash": fingerprint, "frame": DataFrame, "updated_at": timestamp},
+        or None if never parsed
+    """
+    return get_cache().get(_snapshot_key(url, table_id))
+
+
+def set_table_snapshot(url, table_id, fingerprint, df, ttl=TABLE_SNAPSHOT_TTL):
+    """
+    Function to store the parsed version of a table along with the fingerprint of its markup
+    """
+    snapshot = {"url": url, "table_id": table_id, "hash": fingerprint, "frame": df, "updated_at": time.time()}
+    get_cache().set(_snapshot_key(url, table_id), snapshot, expire=ttl)
+
+
+def _baseline_key(url, table_id, consumer):
+    return "delta:" + hashlib.md5(url.encode()).hexdigest() + ":" + table_id + ":" + consumer
+
+
+def get_delta_baseline(url, table_id, consumer):
+    """
+    Function to get the version of a table a consumer last acknowledged with set_delta_baseline
+
+    Returns
+    ----------
+    DataFrame or None
+        the acknowledged table, or None if the consumer never acknowledged it (or it expired)
+    """
+    return get_cache().get(_baseline_key(url, table_id, consumer))
+
+
+def set_delta_baseline(url, table_id, consumer, df, ttl=DELTA_BASELINE_TTL):
+    """
+    Function to record that a consumer has loaded a version of a table, so its next delta starts from it
+    """
+    get_cache().set(_baseline_key(url, table_id, consumer), df, expire=ttl)
+
+
+def frame_delta(old, new):
+    """
+    Function to find the rows of a table that were inserted or modified since a previous version
+
+    Parameters
+    ----------
+    old: DataFrame or None
+        previous version of the table
+    new: DataFrame
+        current version of the table
+
+    Returns
+    ----------
+    DataFrame
+        rows of new that do not appear (with identical values) in old. All of new if there is
+        no previous version or the columns changed.
+    """
+    if old is None or list(old.columns) != list(new.columns):
+        return new
+    old_hashes = pd.util.hash_pandas_object(old.astype(str), index=False)
+    new_hashes = pd.util.hash_pandas_object(new.astype(str), index=False)
+    return new[~new_hashes.isin(old_hashes).to_numpy()]
+
+
+def fetch_url_text(url, cache_time=86400):
+    """
+    Function to fetch the raw HTML of a URL over plain HTTP (no browser), using the cache when available
+    """
+    url_hash = hashlib.md5(("raw:" + url).encode()).hexdigest()
+
+    cached_data = get_cache().get(url_hash)
+    if cached_data is not None:
+        timestamp, html = cached_data
+        if time.time() - timestamp < cache_time:
+            print("Using cached data")
+            return html
+
+    print("Fetching from URL")
+    html = _http_get(url)
+
+    get_cache().set(url_hash, (time.time(), html))
+    return html
+
+
+JS_ASSIGNMENT_PATTERN = re.compile(r"(?:var|let|const)\s+([A-Za-z_$][\w$]*)\s*=\s*(?=[\[{])")
+
+
+def extract_json_payloads(html):
+    """
+    Function to pull the JSON objects/arrays assigned to script variables out of a page
+
+    Parameters
+    ----------
+    html: String
+        raw HTML of the page
+
+    Returns
+    ----------
+    dict
+        variable name -> decoded JSON value, for every assignment that is valid JSON
+    """
+    decoder = json.JSONDecoder()
+    payloads = {}
+    for script in BeautifulSoup(html, "html.parser").find_all("script"):
+        text = script.string or ""
+        for match in JS_ASSIGNMENT_PATTERN.finditer(text):
+            try:
+                payloads[match.group(1)], _ = decoder.raw_decode(text, match.end())
+            except ValueError:
+                # JavaScript object literal rather than JSON, nothing we can use
+                continue
+    return payloads
+
+
 def make_bbref_player_url(bbref_key):
     """
     Function to generate baseball-reference url from bbref_key
@@ -97,6 +429,30 @@ def make_bbref_player_url(bbref_key):
     return url
 
 
+def make_bbref_player_gamelog_url(bbref_key, year, kind="b"):
+    """
+    Function to generate the baseball-reference game log url of a player for one season
+
+    Parameters
+    ----------
+    bbref_key: String
+        bbref_key of the player
+    year: String
+        season of the game log
+    kind: String
+        "b" for the batting game log, "p" for the pitching game log
+
+    Returns
+    ----------
+    String
+        baseball-reference game log url of the player
+    """
+    base_url = "https://www.baseball-reference.com/players/gl.fcgi"
+    url = base_url + "?id=" + bbref_key + "&t=" + kind + "&year=" + str(year)
+
+    return url
+
+
 def is_bbref_player_url(url):
     """
     Check if the given URL contains the word 'players'.
@@ -130,6 +486,30 @@ def create_bbref_team_url(team, year):
     return url
 
 
+def create_bbref_team_gamelog_url(team, year, kind="b"):
+    """
+    Function to create the baseball-reference game log url of a team for one season
+
+    Parameters
+    ----------
+    team: String
+        team name
+    year: String
+        season of the game log
+    kind: String
+        "b" for the batting game log, "p" for the pitching game log
+
+    Returns
+    ----------
+    String
+        baseball-reference team game log url
+    """
+    base_url = "https://www.baseball-reference.com/teams/tgl.cgi"
+    url = base_url + "?team=" + team + "&t=" + kind + "&year=" + str(year)
+
+    return url
+
+
 def is_bbref_team_url(url):
     """
     Check if the given URL contains the word 'teams'.
@@ -0,0 +1,378 @@
+# File: warehouse.py
+# Author: Gabriel DiFiore <difioregabe@gmail.com>
+# (c) 2022-2024
+#
+# Description: File containing a persistent local warehouse of scraped team and player tables,
+# partitioned by source, table id, team and season.
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import json
+import logging
+import os
+import time
+import pandas as pd
+
+from pyball.utils import (
+    create_bbref_team_url, make_bbref_player_url, create_bbref_team_gamelog_url, make_bbref_player_gamelog_url,
+)
+from pyball.baseball_reference_team import BaseballReferenceTeamStatsScraper
+from pyball.baseball_reference_player import BaseballReferencePlayerStatsScraper
+from pyball.baseball_reference_gamelog import BaseballReferenceGameLogScraper, games_after, latest_game
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StatsWarehouse:
+    """
+    A class for keeping a local, partitioned copy of Baseball-Reference tables.
+
+    Every table is stored as its own partition, keyed by source, table id, team
+    (or player key) and season. ``sync()`` only fetches the pages whose partitions
+    are missing or out of date, and partitions for completed seasons are marked
+    immutable so they are never fetched again.
+
+    Attributes:
+    -----------
+    path : str
+        The directory the warehouse is stored in.
+    max_age : int
+        Number of seconds after which a mutable partition is considered out of date.
+
+    Methods:
+    --------
+    sync(teams, years) -> List[Tuple[str, str]]:
+        Fetches the team pages with missing or out of date partitions.
+
+    sync_players(bbref_keys) -> List[str]:
+        Fetches the player pages with missing or out of date partitions.
+
+    refresh_gamelogs(bbref_keys, teams, kind, year) -> Dict[str, int]:
+        Appends the games played since the last refresh to the season's game log partitions.
+
+    load(source, table_id, team, season) -> Optional[pd.DataFrame]:
+        Returns a single partition as a pandas DataFrame.
+
+    partitions() -> pd.DataFrame:
+        Returns the warehouse manifest as a pandas DataFrame.
+    """
+
+    SOURCES = {
+        'bbref_team': BaseballReferenceTeamStatsScraper,
+        'bbref_player': BaseballReferencePlayerStatsScraper,
+        'bbref_player_gamelog': BaseballReferenceGameLogScraper,
+        'bbref_team_gamelog': BaseballReferenceGameLogScraper,
+    }
+    CAREER = 'career'
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, path: str = './.pyball_warehouse', max_age: int = 86400):
+        """
+        Initializes a StatsWarehouse instance.
+
+        Parameters:
+        -----------
+        path : str
+            The directory to store the warehouse in. Created if it does not exist.
+        max_age : int
+            Number of seconds after which a mutable partition is refetched.
+        """
+        self.path = path
+        self.max_age = max_age
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    @staticmethod
+    def _partition_key(source: str, table_id: str, team: str, season) -> str:
+        return "/".join([source, table_id, str(team), str(season)])
+
+    def _partition_path(self, key: str) -> str:
+        return os.path.join(self.path, *key.split("/")) + ".pkl"
+
+    def _load_manifest(self) -> dict:
+        manifest_path = os.path.join(self.path, self.MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        manifest_path = os.path.join(self.path, self.MANIFEST_FILE)
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def _season_complete(season, fetched_at: float) -> bool:
+        """
+        A season is complete once it was fetched in a later calendar year than the season itself.
+        """
+        if not str(season).isdigit():
+            return False
+        return datetime.date.fromtimestamp(fetched_at).year > int(season)
+
+    def is_fresh(self, source: str, table_id: str, team: str, season) -> bool:
+        """
+        Checks whether a partition exists and does not need to be refetched.
+
+        Parameters:
+        -----------
+        source : str
+            The source of the partition, one of SOURCES.
+        table_id : str
+            The HTML id of the table.
+        team : str
+            The team abbreviation (or bbref key for player partitions).
+        season : str or int
+            The season of the partition.
+
+        Returns:
+        --------
+        bool
+            True if the partition is immutable or was fetched less than max_age seconds ago.
+        """
+        entry = self.manifest.get(self._partition_key(source, table_id, team, season))
+        if entry is None:
+            return False
+        if entry["immutable"]:
+            return True
+        return time.time() - entry["fetched_at"] < self.max_age
+
+    def _store_frame(self, key: str, df: pd.DataFrame) -> int:
+        """
+        Atomically writes a partition's DataFrame and returns its number of rows.
+        """
+        path = self._partition_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_pickle(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return len(df)
+
+    def _write_partitions(self, source: str, scraper, team: str, season) -> bool:
+        """
+        Writes every table of a scraper to its partition and records it in the manifest.
+
+        Nothing is recorded if the page could not be fetched, so the next sync retries it.
+        Tables missing from a page that did load are recorded as absent (rows None) but never
+        as immutable, since the page may have been partial, so they are retried once out of date.
+        """
+        if scraper.soup is None:
+            logger.warning("Could not fetch %s %s %s, leaving it for the next sync", source, team, season)
+            return False
+        fetched_at = time.time()
+        immutable = self._season_complete(season, fetched_at)
+        for table_key, table_id in scraper.TABLE_IDS.items():
+            key = self._partition_key(source, table_id, team, season)
+            df = scraper._get_dataframe(table_key)
+            rows = self._store_frame(key, df) if df is not None else None
+            self.manifest[key] = {
+                "source": source,
+                "table_id": table_id,
+                "team": str(team),
+                "season": str(season),
+                "fetched_at": fetched_at,
+                "immutable": immutable and rows is not None,
+                "rows": rows,
+            }
+        self._save_manifest()
+        return True
+
+    def missing_partitions(self, teams: Iterable[str], years: Iterable) -> List[Tuple[str, str]]:
+        """
+        Computes which team seasons have missing or out of date partitions.
+
+        Parameters:
+        -----------
+        teams : Iterable[str]
+            Team abbreviations, e.g. "LAD".
+        years : Iterable[str or int]
+            Seasons to check.
+
+        Returns:
+        --------
+        List[Tuple[str, str]]
+            The (team, year) pairs that need to be fetched.
+        """
+        table_ids = BaseballReferenceTeamStatsScraper.TABLE_IDS.values()
+        years = [str(year) for year in years]
+        return [
+            (team, year)
+            for team in teams
+            for year in years
+            if not all(self.is_fresh('bbref_team', table_id, team, year) for table_id in table_ids)
+        ]
+
+    def sync(self, teams: Iterable[str], years: Iterable) -> List[Tuple[str, str]]:
+        """
+        Fetches the team pages with missing or out of date partitions.
+
+        Parameters:
+        -----------
+        teams : Iterable[str]
+            Team abbreviations, e.g. "LAD".
+        years : Iterable[str or int]
+            Seasons to sync.
+
+        Returns:
+        --------
+        List[Tuple[str, str]]
+            The (team, year) pairs that were fetched. Pages that failed to load are left out.
+        """
+        missing = self.missing_partitions(teams, years)
+        logger.info("Syncing %d team season(s)", len(missing))
+        synced = []
+        for team, year in missing:
+            # Team pages always carry both tables, so only wait for those to render
+            scraper = BaseballReferenceTeamStatsScraper(
+                create_bbref_team_url(team, year),
+                tables=list(BaseballReferenceTeamStatsScraper.TABLE_IDS),
+            )
+            if self._write_partitions('bbref_team', scraper, team, year):
+                synced.append((team, year))
+        return synced
+
+    def sync_players(self, bbref_keys: Iterable[str]) -> List[str]:
+        """
+        Fetches the player pages with missing or out of date partitions.
+
+        Career tables keep changing while a player is active, so player partitions
+        are never marked immutable and are refetched once they are older than max_age.
+
+        Parameters:
+        -----------
+        bbref_keys : Iterable[str]
+            Baseball-Reference keys of the players, e.g. "kershcl01".
+
+        Returns:
+        --------
+        List[str]
+            The bbref keys that were fetched. Pages that failed to load are left out.
+        """
+        table_ids = BaseballReferencePlayerStatsScraper.TABLE_IDS.values()
+        missing = [
+            key for key in bbref_keys
+            if not all(self.is_fresh('bbref_player', table_id, key, self.CAREER) for table_id in table_ids)
+        ]
+        logger.info("Syncing %d player(s)", len(missing))
+        synced = []
+        for key in missing:
+            scraper = BaseballReferencePlayerStatsScraper(make_bbref_player_url(key))
+            if self._write_partitions('bbref_player', scraper, key, self.CAREER):
+                synced.append(key)
+        return synced
+
+    def refresh_gamelogs(self, bbref_keys: Iterable[str] = (), teams: Iterable[str] = (),
+                         kind: str = 'batting', year=None) -> Dict[str, int]:
+        """
+        Appends the games played since the last refresh to the season's game log partitions.
+
+        Only the given season's game log is fetched (and not at all while its partition is
+        younger than max_age), and only games after the last one ingested are appended.
+        The last ingested game is kept in the manifest as its date and doubleheader number.
+
+        Parameters:
+        -----------
+        bbref_keys : Iterable[str]
+            Baseball-Reference keys of the players, e.g. "kershcl01".
+        teams : Iterable[str]
+            Team abbreviations, e.g. "LAD".
+        kind : str
+            'batting' or 'pitching'.
+        year : str or int, optional
+            The season to refresh. Defaults to the current year.
+
+        Returns:
+        --------
+        Dict[str, int]
+            Number of new games appended per player key / team.
+        """
+        if kind not in BaseballReferenceGameLogScraper.TABLE_IDS:
+            raise ValueError(f"Unknown game log: {kind}")
+        year = str(year or datetime.date.today().year)
+        table_id = BaseballReferenceGameLogScraper.TABLE_IDS[kind]
+        url_kind = kind[0]
+        entities = [('bbref_player_gamelog', key, make_bbref_player_gamelog_url(key, year, url_kind))
+                    for key in bbref_keys]
+        entities += [('bbref_team_gamelog', team, create_bbref_team_gamelog_url(team, year, url_kind))
+                     for team in teams]
+
+        appended = {}
+        for source, entity, url in entities:
+            if self.is_fresh(source, table_id, entity, year):
+                appended[entity] = 0
+                continue
+
+            with BaseballReferenceGameLogScraper(url, tables=[kind]) as scraper:
+                if scraper.soup is None:
+                    # Leave the manifest alone so a failed fetch is retried instead of frozen
+                    logger.warning("Could not fetch %s, leaving it for the next refresh", url)
+                    appended[entity] = 0
+                    continue
+                gamelog = scraper._get_dataframe(kind)
+            key = self._partition_key(source, table_id, entity, year)
+            entry = self.manifest.get(key, {})
+            last = tuple(entry["last_game"]) if entry.get("last_game") else None
+            new_games = games_after(gamelog, year, last) if gamelog is not None else pd.DataFrame()
+            appended[entity] = len(new_games)
+
+            rows = entry.get("rows")
+            if len(new_games):
+                existing = self.load(source, table_id, entity, year)
+                stored = pd.concat([existing, new_games], ignore_index=True) if existing is not None else new_games
+                rows = self._store_frame(key, stored.reset_index(drop=True))
+                last = latest_game(new_games, year)
+
+            fetched_at = time.time()
+            self.manifest[key] = {
+                "source": source,
+                "table_id": table_id,
+                "team": str(entity),
+                "season": year,
+                "fetched_at": fetched_at,
+                "immutable": self._season_complete(year, fetched_at),
+                "rows": rows,
+                "last_game": list(last) if last else None,
+            }
+            self._save_manifest()
+            logger.info("Appended %d game(s) to %s", len(new_games), key)
+        return appended
+
+    def load(self, source: str, table_id: str, team: str, season) -> Optional[pd.DataFrame]:
+        """
+        Returns a single partition as a pandas DataFrame.
+
+        Parameters:
+        -----------
+        source : str
+            The source of the partition, one of SOURCES.
+        table_id : str
+            The HTML id of the table, e.g. "team_batting".
+        team : str
+            The team abbreviation (or bbref key for player partitions).
+        season : str or int
+            The season of the partition ("career" for player partitions).
+
+        Returns:
+        --------
+        Optional[pd.DataFrame]
+            The stored table, or None if the partition is missing or the table was not on the page.
+        """
+        key = self._partition_key(source, table_id, team, season)
+        entry = self.manifest.get(key)
+        if entry is None or entry["rows"] is None:
+            return None
+        return pd.read_pickle(self._partition_path(key))
+
+    def partitions(self) -> pd.DataFrame:
+        """
+        Returns the warehouse manifest as a pandas DataFrame, one row per partition.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The source, table id, team, season, fetch time, immutability and row count of each partition.
+        """
+        columns = ["source", "table_id", "team", "season", "fetched_at", "immutable", "rows", "last_game"]
+        return pd.DataFrame(list(self.manifest.values()), columns=columns)
@@ -0,0 +1,34 @@
+import pytest
+from bs4 import BeautifulSoup
+from pyball import cache
+
+
+@pytest.fixture
+def isolated_cache(tmp_path):
+    """
+    Points pyball at an empty cache in the test's temporary directory and puts the previous one back afterwards.
+    """
+    saved = cache._backend
+    backend = cache.DiskCacheBackend(str(tmp_path / "cache"))
+    cache.set_cache(backend)
+    yield backend
+    cache.set_cache(saved)
+
+
+@pytest.fixture
+def serve_page(monkeypatch):
+    """
+    Returns serve(html): every page the scrapers fetch from then on is the given HTML (None for a failed
+    fetch). serve() returns the list of URLs fetched so far, shared across calls.
+    """
+    fetched = []
+
+    def serve(html):
+        def read_url(url, table_ids=None):
+            fetched.append(url)
+            return BeautifulSoup(html, "html.parser") if html is not None else None
+
+        monkeypatch.setattr("pyball.scraper.read_url", read_url)
+        return fetched
+
+    return serve
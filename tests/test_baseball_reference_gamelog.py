@@ -0,0 +1,37 @@
+import datetime
+from pyball import utils
+from pyball.baseball_reference_gamelog import BaseballReferenceGameLogScraper, games_after, latest_game
+from pyball.warehouse import StatsWarehouse
+
+
+def gamelog_page(games):
+    header = "<tr><th>Rk</th><th>Date</th><th>Tm</th><th>H</th></tr>"
+    rows = "".join(f"<tr><th>{i + 1}</th><td>{date}</td><td>CLE</td><td>{i}</td></tr>" for i, date in enumerate(games))
+    # bbref repeats the header row inside the table body
+    repeated = '<tr class="thead"><th>Rk</th><th>Date</th><th>Tm</th><th>H</th></tr>'
+    return (f'<html><body><table id="batting_gamelogs"><thead>{header}</thead>'
+            f'<tbody>{rows}{repeated}</tbody><tfoot><tr><td>Totals</td></tr></tfoot></table></body></html>')
+
+
+def test_baseball_reference_gamelog(tmp_path, isolated_cache, serve_page):
+    games = ["Mar 28", "Mar 29", "Apr 1 (1)"]
+    fetched = serve_page(gamelog_page(games))
+
+    url = utils.make_bbref_player_gamelog_url("ramirjo01", 2024)
+    assert url == "https://www.baseball-reference.com/players/gl.fcgi?id=ramirjo01&t=b&year=2024"
+    gamelog = BaseballReferenceGameLogScraper(url).batting_gamelog()
+    assert list(gamelog["Date"]) == games
+    assert latest_game(gamelog, 2024) == ("2024-04-01", 1)
+    assert len(games_after(gamelog, 2024, ("2024-03-29", 0))) == 1
+
+    # The current season is still in progress, so every refresh refetches its game log
+    year = datetime.date.today().year
+    warehouse = StatsWarehouse(str(tmp_path / "warehouse"), max_age=0)
+    assert warehouse.refresh_gamelogs(["ramirjo01"], year=year) == {"ramirjo01": 3}
+
+    games.extend(["Apr 1 (2)", "Apr 2"])
+    serve_page(gamelog_page(games))
+    assert warehouse.refresh_gamelogs(["ramirjo01"], year=year) == {"ramirjo01": 2}
+    stored = warehouse.load("bbref_player_gamelog", "batting_gamelogs", "ramirjo01", year)
+    assert list(stored["Date"]) == games
+    assert len(fetched) == 3
@@ -14,3 +14,33 @@ def test_baseball_reference_player():
     pitching_stats = scraper.pitching_stats()
     assert isinstance(pitching_stats, pd.DataFrame)
     assert len(pitching_stats) > 0
+
+
+def test_baseball_reference_player_table_delta(isolated_cache, serve_page):
+    rows = ["<tr><td>2023</td><td>13</td></tr>", "<tr><td>2024</td><td>2</td></tr>"]
+
+    def page():
+        table = "<tr><th>Year</th><th>W</th></tr>" + "".join(rows)
+        return f'<html><body><table id="pitching_standard">{table}</table></body></html>'
+
+    serve_page(page())
+    url = "https://www.baseball-reference.com/players/k/kershcl01.shtml"
+
+    first = BaseballReferencePlayerStatsScraper(url, tables=["pitching"])
+    assert len(first.table_delta("pitching")) == 2
+
+    # Not committed (e.g. the load crashed), so the next run gets the same rows again
+    second = BaseballReferencePlayerStatsScraper(url, tables=["pitching"])
+    assert len(second.table_delta("pitching")) == 2
+    second.commit_delta("pitching")
+    assert len(second.table_delta("pitching")) == 0
+
+    rows[1] = "<tr><td>2024</td><td>3</td></tr>"
+    rows.append("<tr><td>2025</td><td>1</td></tr>")
+    serve_page(page())
+    # Another scraper parsing the page does not move the loader's baseline
+    assert BaseballReferencePlayerStatsScraper(url, tables=["pitching"]).pitching_stats() is not None
+    third = BaseballReferencePlayerStatsScraper(url, tables=["pitching"])
+    assert list(third.table_delta("pitching")["Year"]) == ["2024", "2025"]
+    # Each consumer keeps its own baseline
+    assert len(third.table_delta("pitching", consumer="nightly")) == 3
@@ -12,3 +12,26 @@ def test_baseball_reference_player():
     pitching_stats = scraper.pitching_stats()
     assert isinstance(pitching_stats, pd.DataFrame)
     assert len(pitching_stats) > 0
+
+
+def test_baseball_reference_team_releases_soup(isolated_cache, serve_page):
+    serve_page("""<html><body>
+    <table id="team_batting"><tr><th>Name</th><th>HR</th></tr>
+    <tr><td>Bellinger</td><td>39</td></tr><tr><td>Team Totals</td><td>221</td></tr></table>
+    <table id="team_pitching"><tr><th>Name</th><th>SO</th></tr>
+    <tr><td>Kershaw</td><td>202</td></tr><tr><td>Team Totals</td><td>1549</td></tr></table>
+    </body></html>""")
+
+    url = "https://www.baseball-reference.com/teams/LAD/2017.shtml"
+    with BaseballReferenceTeamStatsScraper(url, tables=["batting"]) as scraper:
+        batting_stats = scraper.batting_stats()
+        assert scraper.soup is None
+        assert scraper.batting_stats() is batting_stats
+        assert scraper.pitching_stats() is None
+
+    scraper = BaseballReferenceTeamStatsScraper(url)
+    scraper.batting_stats()
+    assert scraper.soup is not None
+    scraper.pitching_stats()
+    assert scraper.soup is None
+    assert not hasattr(scraper, "__dict__")
@@ -0,0 +1,44 @@
+import threading
+import pytest
+import pandas as pd
+from pyball import cache
+from pyball.cache_server import CacheServer
+
+
+def test_remote_cache(tmp_path):
+    server = CacheServer("127.0.0.1", 0, str(tmp_path))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        node1 = cache.RemoteCacheBackend(server.url, secret="s3cret")
+        node2 = cache.RemoteCacheBackend(server.url, secret="s3cret")
+
+        df = pd.DataFrame({"Name": ["Kershaw"], "SO": [202]})
+        assert node1.set("table:kershcl01", {"hash": "abc", "frame": df})
+        assert node1.set_many({"page:1": "<html>1</html>", "page:2": "<html>2</html>"}, expire=60)
+
+        # A value written by one node is a hit for every other node
+        assert node2.get("table:kershcl01")["frame"].equals(df)
+        assert node2.get_many(["page:1", "page:2", "page:3"]) == {"page:1": "<html>1</html>", "page:2": "<html>2</html>"}
+        assert sorted(node2.iterkeys()) == ["page:1", "page:2", "table:kershcl01"]
+        assert sorted(node2.iterkeys("page:")) == ["page:1", "page:2"]
+
+        # Values not signed with the shared secret are never unpickled
+        intruder = cache.RemoteCacheBackend(server.url, secret="guess")
+        assert intruder.set("page:2", "<html>evil</html>")
+        assert node1.get("page:2") is None
+        # A signed value copied to another key does not verify either
+        server.store.set("page:3", server.store.get("page:1"))
+        assert node1.get("page:3") is None
+
+        assert node2.delete("page:1")
+        assert node1.get("page:1", "missing") == "missing"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # An unreachable server behaves like an empty cache
+    assert cache.RemoteCacheBackend(server.url, secret="s3cret", timeout=1).get("page:2") is None
+
+    with pytest.raises(ValueError):
+        cache.RemoteCacheBackend(server.url, secret="")
@@ -0,0 +1,58 @@
+import pandas as pd
+from pyball import cli
+
+BATTING = ('<table id="team_batting"><tr><th>Name</th><th>HR</th></tr>'
+           "<tr><td>Bellinger</td><td>39</td></tr><tr><td>Team Totals</td><td>221</td></tr></table>")
+PITCHING = ('<table id="team_pitching"><tr><th>Name</th><th>SO</th></tr>'
+            "<tr><td>Kershaw</td><td>202</td></tr><tr><td>Team Totals</td><td>1549</td></tr></table>")
+
+
+def test_cli_export(tmp_path, isolated_cache, serve_page):
+    fetched = serve_page(BATTING)
+
+    output = str(tmp_path / "export")
+    args = ["export", "--teams", "LAD,NYY", "--years", "2016-2017", "--tables", "batting", "--output", output]
+    assert cli.main(args) == 0
+    assert len(fetched) == 4
+
+    batting = pd.read_csv(tmp_path / "export" / "team_batting.csv")
+    assert list(batting.columns) == ["team", "year", "Name", "HR"]
+    assert len(batting) == 4
+
+    # Everything was exported already, so resuming fetches nothing
+    assert cli.main(args) == 0
+    assert len(fetched) == 4
+
+    assert cli.main(args + ["--format", "jsonl", "--no-resume"]) == 0
+    assert len(pd.read_json(tmp_path / "export" / "team_batting.jsonl", lines=True)) == 4
+
+
+def test_cli_export_failed_page(tmp_path, isolated_cache, serve_page):
+    serve_page(None)
+
+    output = str(tmp_path / "export")
+    args = ["export", "--teams", "LAD", "--years", "2017", "--tables", "batting", "--format", "parquet",
+            "--output", output]
+    # The page failed, so the run fails and the page is not marked done
+    assert cli.main(args) == 1
+    assert (tmp_path / "export" / cli.PROGRESS_FILE).read_text() == ""
+
+    serve_page(BATTING)
+    assert cli.main(args) == 0
+    assert (tmp_path / "export" / cli.PROGRESS_FILE).read_text() == "team_batting.parquet:team:LAD:2017\n"
+    assert len(pd.read_parquet(tmp_path / "export" / "team_batting.part-0.parquet")) == 1
+
+
+def test_cli_export_other_tables_and_formats(tmp_path, isolated_cache, serve_page):
+    serve_page(BATTING + PITCHING)
+
+    output = str(tmp_path / "export")
+    args = ["export", "--teams", "LAD", "--years", "2017", "--output", output]
+    assert cli.main(args + ["--tables", "batting"]) == 0
+    # Progress is kept per output file, so another table or format into the same directory is still exported
+    assert cli.main(args + ["--tables", "batting,pitching"]) == 0
+    assert len(pd.read_csv(tmp_path / "export" / "team_batting.csv")) == 1
+    assert list(pd.read_csv(tmp_path / "export" / "team_pitching.csv")["SO"]) == [202]
+
+    assert cli.main(args + ["--tables", "pitching", "--format", "jsonl"]) == 0
+    assert list(pd.read_json(tmp_path / "export" / "team_pitching.jsonl", lines=True)["SO"]) == [202]
@@ -1,5 +1,7 @@
+import hashlib
+import time
 import pandas as pd
-from pyball import savant
+from pyball import cache, savant, utils
 
 
 def test_savant():
@@ -29,3 +31,75 @@ def test_savant():
     result5 = ohtani_batter.get_pitch_tracking()
     assert isinstance(result5, pd.DataFrame)
     assert len(result5) > 0
+
+
+def test_savant_embedded_json(isolated_cache, monkeypatch):
+    page = """<html><head><script>
+    var serverVals = {"playerId": 608070, "percentileRankings": [
+        {"stat": "xwoba", "value": 0.3871234, "percentile": 95, "sort": 1},
+        {"stat": "k_percent", "value": 11.0456, "percentile": 99, "sort": 2}
+    ], "statcast": [{"pitch_type": "FF", "release_speed": 95.1}], "pitchArsenal": [{"id": 1, "label": "x"}]};
+    var config = {debug: true};
+    </script></head></html>"""
+    monkeypatch.setattr(savant, "fetch_url_text", lambda url: page)
+
+    scraper = savant.SavantScraper(
+        "https://baseballsavant.mlb.com/savant-player/jose-ramirez-608070", render=False
+    )
+    assert scraper.soup is None
+
+    result1 = scraper.get_percentile_stats()
+    assert isinstance(result1, pd.DataFrame)
+    assert len(result1) == 2
+    assert list(result1.columns) == ["Metric", "Value", "Percentile"]
+    assert result1["Value"].iloc[0] == 0.3871234
+
+    # Generic keys are not searched and records that do not look like the table are ignored
+    assert scraper.get_pitch_tracking() is None
+
+
+def test_savant_unawaited_table_not_cached_missing(isolated_cache, monkeypatch):
+    monkeypatch.setattr(utils, "_make_driver", lambda: None)
+    url = "https://baseballsavant.mlb.com/savant-player/jose-ramirez-608070"
+    page = ('<html><body><div id="percentileRankings"><table><tr><th>Stat</th><th>Pct</th></tr>'
+            "<tr><td>xwOBA</td><td>91</td></tr></table></div></body></html>")
+
+    def render(awaited):
+        cache.get_cache().set(hashlib.md5(url.encode()).hexdigest(), (time.time(), page, awaited))
+
+    # Rendered waiting only for the percentile table, so the pitch table has not loaded yet
+    render(["percentileRankings"])
+    scraper = savant.SavantScraper(url, tables=["percentile"])
+    assert scraper.soup is not None
+    assert scraper.get_pitch_tracking() is None
+    assert utils.get_negative(url, "detailedPitches") is None
+
+    # The default wait is for the pitch table only, so it proves nothing about the others
+    render(["detailedPitches"])
+    scraper = savant.SavantScraper(url)
+    assert scraper.soup is not None
+    assert scraper.get_batting_stats() is None
+    assert utils.get_negative(url, "statcast_glance_batter") is None
+
+    # Rendered waiting for the pitch table, so it really is missing
+    render(["detailedPitches"])
+    assert savant.SavantScraper(url, tables=["pitch_tracking"]).get_pitch_tracking() is None
+    assert utils.get_negative(url, "detailedPitches")["reason"] == "table not found"
+
+
+def test_savant_json_miss_does_not_hide_rendered_table(isolated_cache, serve_page, monkeypatch):
+    url = "https://baseballsavant.mlb.com/savant-player/jose-ramirez-608070"
+    monkeypatch.setattr(savant, "fetch_url_text", lambda url: "<html><script>var config = {};</script></html>")
+    assert savant.SavantScraper(url, render=False).get_percentile_stats() is None
+
+    def forbidden(url):
+        raise RuntimeError("403 Client Error: Forbidden")
+
+    monkeypatch.setattr(savant, "fetch_url_text", forbidden)
+    assert savant.SavantScraper(url + "?stats=statcast-r-hitting-mlb", render=False).payloads is None
+    assert utils.get_negative(url + "?stats=statcast-r-hitting-mlb") is None
+
+    page = ('<html><body><div id="percentileRankings"><table><tr><th>Stat</th><th>Pct</th></tr>'
+            "<tr><td>xwOBA</td><td>91</td></tr></table></div></body></html>")
+    serve_page(page)
+    assert len(savant.SavantScraper(url).get_percentile_stats()) == 1
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from pyball import stats
+
+
+def test_stats():
+    career = pd.DataFrame({
+        "Year": ["2022", "2023", "2023", "2023", "2 Yrs"],
+        "Tm": ["CLE", "2TM", "CLE", "NYY", ""],
+        "PA": ["600", "600", "300", "300", "1200"],
+        "AB": ["500", "510", "250", "260", "1010"],
+        "H": ["150", "150", "70", "80", "300"],
+        "2B": ["30", "30", "15", "15", "60"],
+        "3B": ["2", "1", "1", "0", "3"],
+        "HR": ["30", "22", "10", "12", "52"],
+        "BB": ["80", "70", "40", "30", "150"],
+        "IBB": ["10", "0", "0", "0", "10"],
+        "HBP": ["5", "5", "3", "2", "10"],
+        "SF": ["5", "6", "3", "3", "11"],
+        "SO": ["100", "110", "60", "50", "210"],
+    })
+    stacked = stats.stack_tables({"ramirjo01": career})
+    # The career total and the 2TM row for the traded season are dropped and text columns become numbers
+    assert len(stacked) == 3
+    assert stacked["season"].tolist() == [2022, 2023, 2023]
+    assert pd.api.types.is_numeric_dtype(stacked["HR"])
+
+    weights = {2022: {"BB": 0.7, "HBP": 0.7, "1B": 0.9, "2B": 1.25, "3B": 1.6, "HR": 2.1}}
+    rates = stats.batting_rates(stacked, weights=weights)
+    singles = 150 - 30 - 2 - 30
+    expected = (0.7 * 70 + 0.7 * 5 + 0.9 * singles + 1.25 * 30 + 1.6 * 2 + 2.1 * 30) / (500 + 70 + 5 + 5)
+    assert np.isclose(rates["wOBA"].iloc[0], expected)
+    assert np.isclose(rates["K-BB%"].iloc[0], 100 * (100 - 80) / 600)
+
+    totals = stats.aggregate(stacked)
+    assert totals.loc[totals["season"] == 2023, "PA"].item() == 600
+
+    pitching = stats.pitching_rates(pd.DataFrame({"IP": [6.1, 0.2], "BF": [25, 3], "SO": [7, 0], "BB": [2, 1]}))
+    assert np.isclose(pitching["K/9"].iloc[0], 9 * 7 / (19 / 3))
+
+    arsenal = pd.DataFrame({
+        "player": [1, 1, 2],
+        "season": [2024, 2024, 2024],
+        "#": [300, 100, 50],
+        "Whiffs": [30, 20, 5],
+        "Swings": [150, 50, 25],
+    })
+    mix = stats.pitch_mix(arsenal)
+    assert mix["Usage%"].tolist() == [75.0, 25.0, 100.0]
+    assert mix["Whiff%"].tolist() == [20.0, 40.0, 20.0]
@@ -0,0 +1,61 @@
+import pandas as pd
+from pyball import store, utils
+
+
+def test_store_query(tmp_path, isolated_cache):
+    pitches = {
+        "https://baseballsavant.mlb.com/savant-player/shohei-ohtani-660271": [["FF", "97.1"], ["SL", "85.0"]],
+        "https://baseballsavant.mlb.com/savant-player/clayton-kershaw-477132": [["FF", "90.2"], ["CU", "72.4"]],
+    }
+    for url, rows in pitches.items():
+        df = pd.DataFrame(rows, columns=["Pitch", "MPH"])
+        utils.set_table_snapshot(url, "json:detailedPitches", utils.table_fingerprint(df.to_json()), df)
+    # The rendered version of a table has its own schema and is stored apart from the JSON one
+    rendered = pd.DataFrame([["4-Seam Fastball", "97"]], columns=["Pitch Type", "Velo"])
+    ohtani = "https://baseballsavant.mlb.com/savant-player/shohei-ohtani-660271"
+    utils.set_table_snapshot(ohtani, "detailedPitches", utils.table_fingerprint(rendered.to_json()), rendered)
+    batting = pd.DataFrame([["2023", "150"], ["2024", "160"], ["10 Yrs", "1500"]], columns=["Year", "H"])
+    url = utils.make_bbref_player_url("ramirjo01")
+    utils.set_table_snapshot(url, "batting_standard", utils.table_fingerprint(batting.to_json()), batting)
+
+    column_store = store.ColumnStore(str(tmp_path / "store"))
+    store.set_store(column_store)
+    assert store.ingest() == 4
+    # Unchanged snapshots are not stored again
+    assert store.ingest() == 0
+    assert column_store.tables() == ["batting_standard", "detailedPitches", "json_detailedPitches"]
+    assert list(store.query("pitch_tracking")["Velo"]) == [97]
+
+    fast = store.query("json:pitch_tracking", filter=[("MPH", ">", 89)], columns=["Pitch", "MPH"])
+    assert sorted(fast["player"]) == ["477132", "660271"]
+    assert list(fast.columns) == ["player", "season", "page", "Pitch", "MPH"]
+
+    assert list(store.query("json:detailedPitches", filter=[("Pitch", "in", ["CU"])])["player"]) == ["477132"]
+    assert store.query("json:pitch_tracking", filter=[("MPH", ">", 100)]).empty
+    assert len(store.query("json:pitch_tracking", players=["660271"])) == 2
+
+    seasons = store.query("batting_standard", seasons=[2024])
+    assert list(seasons["H"]) == [160]
+    assert list(seasons["player"]) == ["ramirjo01"]
+
+
+def test_store_page_variants(tmp_path, isolated_cache):
+    ohtani = "https://baseballsavant.mlb.com/savant-player/shohei-ohtani-660271"
+    pages = {
+        ohtani + "?stats=statcast-r-hitting-mlb": [["FF", "94.0"]],
+        ohtani + "?stats=statcast-r-pitching-mlb&playerType=pitcher": [["FF", "97.1"], ["ST", "85.0"]],
+    }
+    for url, rows in pages.items():
+        df = pd.DataFrame(rows, columns=["Pitch Type", "MPH"])
+        utils.set_table_snapshot(url, "detailedPitches", utils.table_fingerprint(df.to_json()), df)
+
+    store.set_store(store.ColumnStore(str(tmp_path / "store")))
+    assert store.ingest() == 2
+    # The batter and pitcher pages of one player are stored side by side
+    pitches = store.query("pitch_tracking", players=["660271"]).sort_values("MPH")
+    assert list(pitches["MPH"]) == [85.0, 94.0, 97.1]
+    assert list(pitches["page"]) == [
+        "playerType=pitcher&stats=statcast-r-pitching-mlb",
+        "stats=statcast-r-hitting-mlb",
+        "playerType=pitcher&stats=statcast-r-pitching-mlb",
+    ]
@@ -1,4 +1,6 @@
-from pyball import utils
+import hashlib
+import time
+from pyball import cache, utils
 
 
 def test_utils():
@@ -13,3 +15,43 @@ def test_utils():
     result3 = utils.make_savant_player_url("ramirez", "jose", "608070")
     assert isinstance(result3, str)
     assert result3 == "https://baseballsavant.mlb.com/savant-player/jose-ramirez-608070"
+
+
+def test_fetch_url_content_table_aware_cache(isolated_cache, monkeypatch):
+
+    def no_browser():
+        raise RuntimeError("browser should not be launched")
+
+    monkeypatch.setattr(utils, "_make_driver", no_browser)
+
+    url = "https://baseballsavant.mlb.com/savant-player/jose-ramirez-608070"
+    html = '<div id="percentileRankings"><table></table></div>'
+    cache.get_cache().set(hashlib.md5(url.encode()).hexdigest(), (time.time(), html, ["percentileRankings"]))
+
+    soup = utils.fetch_url_content(url, table_ids=["percentileRankings"])
+    assert soup.find("div", id="percentileRankings") is not None
+
+    # The cached page was only rendered until the percentile table appeared
+    assert utils.read_url(url, ["detailedPitches"]) is None
+
+
+def test_negative_cache(isolated_cache, monkeypatch):
+    calls = []
+
+    def failing_fetch(url, table_ids=None):
+        calls.append(url)
+        raise RuntimeError("503 Service Unavailable")
+
+    monkeypatch.setattr(utils, "fetch_url_content", failing_fetch)
+
+    url = "https://www.baseball-reference.com/players/r/ramirjo01.shtml"
+    assert utils.read_url(url) is None
+    # The failure is remembered, so the second read does not fetch again
+    assert utils.read_url(url) is None
+    assert len(calls) == 1
+    assert "503" in utils.get_negative(url)["reason"]
+
+    utils.record_negative(url, "table not found", "pitching_standard")
+    assert len(utils.negative_entries()) == 2
+    assert utils.purge_negative(url) == 2
+    assert utils.negative_entries() == []
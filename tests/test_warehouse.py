@@ -0,0 +1,58 @@
+import pandas as pd
+from pyball import utils
+from pyball.warehouse import StatsWarehouse
+
+TEAM_PAGE = """
+<html><body>
+<table id="team_batting"><tr><th>Name</th><th>HR</th></tr>
+<tr><td>Bellinger</td><td>39</td></tr><tr><td>Team Totals</td><td>221</td></tr></table>
+<table id="team_pitching"><tr><th>Name</th><th>SO</th></tr>
+<tr><td>Kershaw</td><td>202</td></tr><tr><td>Team Totals</td><td>1549</td></tr></table>
+</body></html>
+"""
+
+
+def test_warehouse(tmp_path, isolated_cache, serve_page):
+    fetched = serve_page(TEAM_PAGE)
+
+    warehouse = StatsWarehouse(str(tmp_path / "warehouse"))
+    assert warehouse.sync(["LAD"], [2017]) == [("LAD", "2017")]
+    assert len(fetched) == 1
+
+    batting = warehouse.load("bbref_team", "team_batting", "LAD", 2017)
+    assert isinstance(batting, pd.DataFrame)
+    assert len(batting) == 1
+
+    # Completed seasons are immutable, so a second sync (even from a fresh instance) fetches nothing
+    assert StatsWarehouse(str(tmp_path / "warehouse")).sync(["LAD"], [2017]) == []
+    assert len(fetched) == 1
+
+    partitions = warehouse.partitions()
+    assert len(partitions) == 2
+    assert partitions["immutable"].all()
+
+
+def test_warehouse_failed_fetch(tmp_path, isolated_cache, serve_page):
+    serve_page(None)
+
+    # A failed fetch records nothing, so the season is retried instead of frozen as empty
+    warehouse = StatsWarehouse(str(tmp_path / "warehouse"))
+    assert warehouse.sync(["LAD"], [2017]) == []
+    assert warehouse.partitions().empty
+
+    serve_page(TEAM_PAGE)
+    assert warehouse.sync(["LAD"], [2017]) == [("LAD", "2017")]
+    assert len(warehouse.load("bbref_team", "team_pitching", "LAD", 2017)) == 1
+
+    # A table missing from a page that loaded is not frozen either, it is retried once out of date
+    serve_page(TEAM_PAGE.split('<table id="team_pitching">')[0])
+    warehouse = StatsWarehouse(str(tmp_path / "partial"), max_age=0)
+    assert warehouse.sync(["LAD"], [2018]) == [("LAD", "2018")]
+    assert warehouse.load("bbref_team", "team_pitching", "LAD", 2018) is None
+
+    # (once the table's missing-table cache entry has expired too)
+    utils.purge_negative()
+    serve_page(TEAM_PAGE)
+    assert warehouse.sync(["LAD"], [2018]) == [("LAD", "2018")]
+    assert len(warehouse.load("bbref_team", "team_pitching", "LAD", 2018)) == 1
+    assert warehouse.sync(["LAD"], [2018]) == []